@@ -1,27 +1,96 @@
 """Complete video processing engine in one go."""
 
-import json
+import copy
 import logging
 import os
+import threading
 import time
 from uuid import uuid4
 from datetime import datetime
+from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from acquisition.core.scoobydoo import live, stored
-from acquisition.utils.common import now
+from acquisition.utils.common import backoff_delay, now
 from acquisition.utils.generate import bucket_name, order_name
-from acquisition.utils.boto_wrap import upload_to_bucket
+from acquisition.utils.boto_wrap import (AWS_ACCESS_KEY, AWS_SECRET_KEY,
+                                         upload_to_bucket)
 # pyright: reportMissingImports=false
 from app import models
 
-_AWS_ACCESS_KEY = 'XAMES3'
-_AWS_SECRET_KEY = 'XAMES3'
+# Shared session for reusing keep-alive connections to the processing
+# server instead of paying for a fresh TCP handshake on every trigger.
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=10,
+                                      pool_maxsize=10,
+                                      max_retries=0))
 
+# Maximum attempts for uploading & triggering the processing server.
+MAX_RETRIES = 6
+# Milestone recorded against the order once the trigger retries are
+# exhausted. It must match the failed milestone in the app's database,
+# nothing is recorded if it isn't configured.
+TRIGGER_FAILED_MILESTONE = (int(os.environ['TRIGGER_FAILED_MILESTONE'])
+                            if os.getenv('TRIGGER_FAILED_MILESTONE') else
+                            None)
 
-def calling_processing(json_obj: str, log: logging.Logger) -> bool:
-  """This is something which works with/on REST api."""
+# Circuit breaker shared by all the sheep threads. It opens after
+# `_BREAKER_THRESHOLD` consecutive trigger failures & short-circuits the
+# calls for `_BREAKER_COOLDOWN` secs before letting a single probe through.
+# Short-circuited calls don't count against the `MAX_RETRIES` attempts.
+_BREAKER_THRESHOLD = 5
+_BREAKER_COOLDOWN = 60.0
+_breaker = {'state': 'closed', 'failures': 0, 'opened_at': 0.0}
+_breaker_lock = threading.Lock()
+
+
+def _breaker_allows() -> bool:
+  """Return True if the circuit breaker allows a trigger request."""
+  with _breaker_lock:
+    if _breaker['state'] == 'closed':
+      return True
+    if (_breaker['state'] == 'open' and
+        time.time() - _breaker['opened_at'] >= _BREAKER_COOLDOWN):
+      _breaker['state'] = 'half-open'
+      return True
+    return False
+
+
+def _breaker_wait() -> float:
+  """Return secs to wait before the circuit breaker allows a request."""
+  with _breaker_lock:
+    if _breaker['state'] == 'open':
+      return max(0.0,
+                 _breaker['opened_at'] + _BREAKER_COOLDOWN - time.time())
+    if _breaker['state'] == 'half-open':
+      # Another thread is probing the server, check back shortly.
+      return 1.0
+    return 0.0
+
+
+def _breaker_record(success: bool) -> None:
+  """Record trigger outcome and trip or reset the circuit breaker."""
+  with _breaker_lock:
+    if success:
+      _breaker.update(state='closed', failures=0)
+      return
+    _breaker['failures'] += 1
+    if (_breaker['state'] == 'half-open' or
+        _breaker['failures'] >= _BREAKER_THRESHOLD):
+      _breaker.update(state='open', opened_at=time.time())
+
+
+def calling_processing(json_obj: dict,
+                       log: logging.Logger) -> Optional[bool]:
+  """This is something which works with/on REST api.
+
+  Returns None if the circuit breaker short-circuited the request.
+  """
+  if not _breaker_allows():
+    log.error('Processing server circuit is open, skipping the trigger.')
+    return None
   try:
     header = {'api-key': ('epVgnissecorP2020yjbadsdsa05jdagdsah22a'
                           'll0ahm0duil0lah03333fo0r33eve0ryt0hin0g')}
@@ -33,28 +102,61 @@ def calling_processing(json_obj: str, log: logging.Logger) -> bool:
     # Production
     URL = 'http://161.35.6.215:9000/new_connection_order/'
 
-    requests.post(URL, json.dumps(json_obj), headers=header)
+    response = _SESSION.post(URL, json=json_obj, headers=header,
+                             timeout=(5, 30))
+    response.raise_for_status()
 
+    _breaker_record(True)
     return True
   except Exception as error:
+    _breaker_record(False)
     log.critical('Something went wrong while running calling_processing().')
     log.exception(error)
     return False
 
 
-def spin(json_obj: str,
+def _trigger(json_data: dict,
+             log: logging.Logger,
+             timeout: float) -> bool:
+  """Trigger the processing server with bounded, jittered retries.
+
+  While the circuit breaker is open the trigger waits for the cooldown
+  instead of spending its attempts on short-circuited calls.
+  """
+  attempt = 0
+  while attempt < MAX_RETRIES:
+    wait = _breaker_wait()
+    if wait > 0:
+      log.warning('Processing server circuit is open, waiting '
+                  f'{wait:.1f} secs before triggering.')
+      time.sleep(wait)
+      continue
+    trigger_status = calling_processing(json_data, log)
+    if trigger_status:
+      return True
+    if trigger_status is None:
+      continue
+    attempt += 1
+    delay = backoff_delay(attempt - 1, cap=timeout)
+    log.error(f'Trigger status: FAILED (attempt {attempt}/{MAX_RETRIES}), '
+              f'retrying after {delay:.1f} secs.')
+    time.sleep(delay)
+  return False
+
+
+def spin(json_data: dict,
          run_date: str,
          current: datetime,
          log: logging.Logger,
          db_pk: int) -> None:
   """Spin the Video Processing Engine."""
+  # The scheduler reuses the order across run cycles, so the per-run
+  # fields are only written to a copy of it.
+  json_data = copy.deepcopy(json_data)
   try:
     start = now()
     org_file = None
 
-    json_data = json.loads(json_obj)
-    log.info('Parsed consumer JSON request.')
-
     country = json_data.get('country_code', 'xa')
     customer = json_data.get('customer_id', 0)
     contract = json_data.get('contract_id', 0)
@@ -111,23 +213,34 @@ def spin(json_obj: str,
     milestone_db.save()
     log.info('Event Milestone 01 - Video Acquisition: UPDATED')
 
-    while True:
-      log.info("Backing up the raw video on cloud...")
-      json_data['db_pk'] = db_pk
-      json_data['org_file'] = upload_to_bucket(_AWS_ACCESS_KEY,
-                                               _AWS_SECRET_KEY,
-                                               "archived-order-uploads",
-                                               org_file,
-                                               log,
-                                               directory=bucket)
-      trigger_status = calling_processing(json_data, log)
-      if trigger_status:
-        log.info('Trigger status: SUCCESSFULL')
-        os.remove(org_file)
-        break
+    log.info("Backing up the raw video on cloud...")
+    json_data['db_pk'] = db_pk
+    json_data['org_file'] = upload_to_bucket(AWS_ACCESS_KEY,
+                                             AWS_SECRET_KEY,
+                                             "archived-order-uploads",
+                                             org_file,
+                                             log,
+                                             directory=bucket)
+    if json_data['org_file'] is None:
+      log.critical(f'Unable to back up raw video "{org_file}" on cloud.')
+      return
+
+    if _trigger(json_data, log, float(timeout)):
+      log.info('Trigger status: SUCCESSFULL')
+      os.remove(org_file)
+    else:
+      log.critical(f'Trigger failed after {MAX_RETRIES} attempts, raw video '
+                   f'"{org_file}" retained for manual processing.')
+      if TRIGGER_FAILED_MILESTONE is None:
+        log.warning('TRIGGER_FAILED_MILESTONE is not set, skipping Event '
+                    'Milestone - Trigger Failed.')
+        return
+      log.info('Updating Event Milestone - Trigger Failed...')
+      if save_milestone(db_pk, TRIGGER_FAILED_MILESTONE):
+        log.info('Event Milestone - Trigger Failed: UPDATED')
       else:
-        log.error('Trigger status: FAILED')
-        time.sleep(timeout)
+        log.error('Unable to update Event Milestone - Trigger Failed.')
+      return
 
     log.info(f'Acquisition Engine took {now() - start} to acquire video.')
   except KeyboardInterrupt:
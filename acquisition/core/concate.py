@@ -1,15 +1,16 @@
 """A subservice for concatenating the videos."""
 
 import os
+import subprocess
 from typing import Optional
 
-from acquisition.core.trim import duration as drn
-from acquisition.utils.boto_wrap import video_file_extensions
-from acquisition.utils.common import file_size, timestamp_dirname
+from acquisition.utils.boto_wrap import is_video
+from acquisition.utils.common import timestamp_dirname
 
 
 def concate_videos(directory: str,
-                   delete_old_files: bool = True) -> Optional[str]:
+                   delete_old_files: bool = True,
+                   sort_by_name: bool = False) -> Optional[str]:
   """Concatenates video.
 
   Concatenates videos as per the requirements.
@@ -19,37 +20,47 @@ def concate_videos(directory: str,
     output: Name of the output file.
     delete_old_files: Boolean (default: True) value to delete the older
                       files once the concatenation is done.
+    sort_by_name: Boolean (default: False) value to order the files by
+                  name instead of their modification time.
 
   Returns:
     Path where the concatenated file is created.
   """
-  files = [os.path.join(directory, file) for file in os.listdir(directory)
-           if file_size(os.path.join(directory, file)) != '300.0 bytes']
-  files.sort(key=os.path.getctime)
-  files = [f"file '{file}'\n" for file in files
-           if file.endswith(video_file_extensions)]
-  if len(os.listdir(directory)) == 0:
+  entries = list(os.scandir(directory))
+  if len(entries) == 0:
     return None
-  if len(os.listdir(directory)) == 1:
-    if drn(os.path.join(directory, os.listdir(directory)[0])) == '300.0 bytes':
-      os.remove(os.path.join(directory, os.listdir(directory)[0]))
+  if len(entries) == 1:
+    if entries[0].stat().st_size == 300:
+      os.remove(entries[0].path)
       return None
-    return os.path.join(directory, os.listdir(directory)[0])
-  temp_file_xa = os.path.join(directory, f'{timestamp_dirname()}.tmp_xa')
+    return entries[0].path
+  clips = [entry for entry in entries
+           if is_video(entry.name)]
+  if sort_by_name:
+    clips.sort(key=lambda entry: entry.name)
+  else:
+    clips.sort(key=lambda entry: entry.stat().st_mtime)
+  files = [f"file '{entry.path}'\n" for entry in clips
+           if entry.stat().st_size != 300]
+  timestamp = timestamp_dirname()
+  temp_file_xa = os.path.join(directory, f'{timestamp}.tmp_xa')
   with open(temp_file_xa, 'w') as file:
     file.writelines(files)
-  output = os.path.join(directory, f'{timestamp_dirname()}.mp4')
-  os.system(f'ffmpeg -loglevel error -y -f concat -safe 0 -i '
-            f'{os.path.join(directory, f"{timestamp_dirname()}.tmp_xa")} '
-            f'-vcodec copy -acodec copy {output}')
+  output = os.path.join(directory, f'{timestamp}.mp4')
+  # Neither the file list nor a partial output may be left behind on a
+  # failure, the next run would pick them up as the acquired video.
+  try:
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-y', '-f', 'concat',
+                    '-safe', '0', '-i', temp_file_xa, '-vcodec', 'copy',
+                    '-acodec', 'copy', output], check=True)
+  except BaseException:
+    if os.path.isfile(output):
+      os.remove(output)
+    raise
+  finally:
+    os.remove(temp_file_xa)
   if delete_old_files:
-    temp = [os.path.join(directory, file) for file in os.listdir(directory)
-            if os.path.join(directory, file).endswith(video_file_extensions)]
-    temp.append(temp_file_xa)
-    try:
-      temp.remove(output)
-    except ValueError:
-      pass
-    for file in temp:
-      os.remove(file)
+    for entry in clips:
+      if entry.path != output:
+        os.remove(entry.path)
   return output
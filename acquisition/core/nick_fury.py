@@ -1,6 +1,7 @@
-import json
+import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List
 from uuid import uuid4
@@ -18,7 +19,10 @@ if deployed:
 else:
   _log = log('info')
 
-threads = threading.Semaphore(100)
+# Bounded pool of sheep threads, orders beyond the pool size wait in the
+# executor's queue until a sheep is released.
+_EXEC = ThreadPoolExecutor(max_workers=int(os.getenv('THREAD_POOL_SIZE', 100)),
+                           thread_name_prefix='order')
 orders = []
 
 
@@ -41,76 +45,85 @@ class SpawnTheSheep(object):
 pool = SpawnTheSheep()
 
 
-def sheep(threads: threading.Semaphore, json_obj: dict, db_pk: int) -> None:
+def sheep(json_obj: dict, db_pk: int, name: str) -> None:
   """Sheep thread object.
   
   Args:
-    threads: Thread semaphore object (thread count).
     json_obj: JSON dictionary which Admin sends to VPE.
     db_pk: Primary key of Database entry.
+    name: Thread name recorded against the order.
   """
-  with threads:
-    name = threading.currentThread().getName()
-    pool.spawn(name)
-    updated_date = None
-
-    try:
-      while True:
-        start_time = json_obj['start_time']
-        run_date = json_obj['start_date']
-        end_date = json_obj['end_date']
-        end_date = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-        timezone = json_obj.get('camera_timezone', 'UTC')
-        run_date = updated_date if updated_date else run_date
-        _start_time = f'{run_date} {start_time}'
-        _start_time = datetime_to_utc(_start_time,
-                                      timezone,
-                                      '%Y-%m-%d %H:%M:%S')
-        _start_obj = datetime.strptime(_start_time, '%Y-%m-%d %H:%M:%S')
-
-        if now().date() < end_date.date():
-          _log.critical('Acquisition Engine is scheduled to start from '
-                        f'{_start_time} till {end_date.date()} for order '
-                        f'#{db_pk}.')
-        else:
-          pool.despawn(name)
-          _log.warning(f'Thread "{name}" released.')
-
-        while now().date() < end_date.date():
-          if str(now()) == str(_start_time):
-            status_db = models.RequestStatus.objects.filter(id=db_pk).values()
-            status_db.update(processing_status_id=2)
-            spin(json.dumps(json_obj), run_date, now(), _log, db_pk)
-            status_db = models.RequestStatus.objects.filter(id=db_pk).values()
-            status_db.update(processing_status_id=1)
-
-            run_date = now() + timedelta(days=1)
-            run_date = run_date.strftime('%Y-%m-%d')
-
-            if json_obj.get("use_archived", False):
-              if not json_obj["sub_json"].get("earthcam_download", False):
-                pool.despawn(name)
-                _log.warning(f'Thread "{name}" released.')
-
-            if str(end_date.date()) == str(run_date):
-              _log.critical('Acquisition Engine has stopped updating the next '
-                            f'run cycle for order #{db_pk}.')
-              status_db.update(processing_status_id=3)
-              pool.despawn(name)
-              _log.warning(f'Thread "{name}" released.')
-            else:
-              _log.critical('Acquisition Engine is updating the next run '
-                            f'cycle for order #{db_pk}...')
-              status_db.update(processing_status_id=1)
-              updated_date = run_date
-              break
-    
-          time.sleep(1.0)
-    except KeyboardInterrupt:
-      _log.error('Video processing engine sheep interrupted.')
+  threading.current_thread().name = name
+  pool.spawn(name)
+  updated_date = None
+  released = False
+
+  try:
+    start_time = json_obj['start_time']
+    end_date = json_obj['end_date']
+    end_date = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+    timezone = json_obj.get('camera_timezone', 'UTC')
+
+    while True:
+      run_date = updated_date if updated_date else json_obj['start_date']
+      _start_time = f'{run_date} {start_time}'
+      _start_time = datetime_to_utc(_start_time,
+                                    timezone,
+                                    '%Y-%m-%d %H:%M:%S')
+      _start_obj = datetime.strptime(_start_time, '%Y-%m-%d %H:%M:%S')
+
+      if now().date() >= end_date.date():
+        break
+
+      _log.critical('Acquisition Engine is scheduled to start from '
+                    f'{_start_time} till {end_date.date()} for order '
+                    f'#{db_pk}.')
+
+      delta = (_start_obj - now()).total_seconds()
+      if delta < 0:
+        _log.warning(f'Start time {_start_time} has already passed for '
+                     f'order #{db_pk}, skipping to the next run cycle.')
+        updated_date = datetime.strptime(run_date, '%Y-%m-%d')
+        updated_date = (updated_date + timedelta(days=1)).strftime('%Y-%m-%d')
+        continue
+      time.sleep(delta)
+
+      status_db = models.RequestStatus.objects.filter(id=db_pk)
+      status_db.update(processing_status_id=2)
+      spin(json_obj, run_date, now(), _log, db_pk)
+
+      run_date = now() + timedelta(days=1)
+      run_date = run_date.strftime('%Y-%m-%d')
+
+      # Archived orders release their pool slot after the first run but
+      # keep being rescheduled like any other order.
+      if (json_obj.get("use_archived", False) and
+              not json_obj["sub_json"].get("earthcam_download", False) and
+              not released):
+        pool.despawn(name)
+        released = True
+        _log.warning(f'Thread "{name}" released.')
+
+      if str(end_date.date()) == str(run_date):
+        _log.critical('Acquisition Engine has stopped updating the next '
+                      f'run cycle for order #{db_pk}.')
+        status_db.update(processing_status_id=3)
+        break
+
+      _log.critical('Acquisition Engine is updating the next run '
+                    f'cycle for order #{db_pk}...')
+      status_db.update(processing_status_id=1)
+      updated_date = run_date
+
+    if not released:
       pool.despawn(name)
-    except Exception as _error:
-      _log.exception(_error)
+      _log.warning(f'Thread "{name}" released.')
+  except KeyboardInterrupt:
+    _log.error('Video processing engine sheep interrupted.')
+    if not released:
+      pool.despawn(name)
+  except Exception as _error:
+    _log.exception(_error)
 
 
 def hill(orders: List):
@@ -122,6 +135,4 @@ def hill(orders: List):
                                       processing_status_id=2)
     request_db.save()
     db_pk = request_db.id
-    t = threading.Thread(target=sheep, name=f'order_{agl}',
-                          args=(threads, idx, db_pk))
-    t.start()
+    _EXEC.submit(sheep, idx, db_pk, f'order_{agl}')
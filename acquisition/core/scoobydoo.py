@@ -2,6 +2,8 @@
 
 import logging
 import os
+import shlex
+import subprocess
 import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union
@@ -9,8 +11,8 @@ from typing import Optional, Union
 from acquisition.core.concate import concate_videos
 from acquisition.core.trim import duration as drn
 from acquisition.utils.boto_wrap import access_file
-from acquisition.utils.common import (calculate_duration, datetime_to_utc,
-                                      file_size, now, seconds_to_datetime)
+from acquisition.utils.common import (backoff_delay, calculate_duration,
+                                      datetime_to_utc, now, seconds_to_datetime)
 from acquisition.utils.fetch import (batch_download_from_ftp,
                                      download_from_azure,
                                      download_from_google_drive,
@@ -46,6 +48,34 @@ def ffmpeg_str(source: str,
           f'-timeout {timeout}')
 
 
+def record(source: str,
+           file_name: str,
+           duration: Union[float, int],
+           camera_timeout: float,
+           log: logging.Logger) -> None:
+  """Record the live feed using FFMPEG without blocking on a shell.
+
+  Args:
+    source: RTSP camera url.
+    file_name: Path where you need to save the output file.
+    duration: Duration in secs that needs to be captured by FFMPEG.
+    camera_timeout: Maximum time to wait until disconnection occurs.
+    log: Logger object.
+  """
+  command = ffmpeg_str(source, file_name, duration, camera_timeout)
+  process = subprocess.Popen(shlex.split(command), stdin=subprocess.DEVNULL,
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE)
+  try:
+    _, error = process.communicate(timeout=duration + camera_timeout + 10)
+  except subprocess.TimeoutExpired:
+    process.kill()
+    _, error = process.communicate()
+    log.warning('Recording exceeded the expected duration, FFMPEG killed.')
+  if error:
+    log.error(error.decode(errors='ignore').strip())
+
+
 def live(bucket_name: str,
          order_name: str,
          run_date: str,
@@ -85,27 +115,27 @@ def live(bucket_name: str,
   vid_type = video_type(True, True, True)
   temp = os.path.join(videos, f'{bucket_name}{order_name}')
 
-  if not os.path.isdir(temp):
-    os.mkdir(temp)
+  os.makedirs(temp, exist_ok=True)
   temp_file = os.path.join(temp, f'{bucket_name}{order_name}{vid_type}.mp4')
 
   url = configure_camera_url(camera_address, camera_username,
                              camera_password, camera_port)
-  slept_duration, idx = 0, 1
+  slept_duration, idx, attempt = 0, 1, 0
 
   if duration != 0:
     try:
       while True:
         if camera_live(camera_address, camera_port, log, camera_timeout):
+          attempt = 0
           file = filename(temp_file, idx)
           log.info('Recording started for selected camera.')
-          os.system(ffmpeg_str(url, file, duration, camera_timeout))
+          record(url, file, duration, camera_timeout, log)
 
           stop_utc = now().replace(tzinfo=timezone.utc).timestamp()
           stop_secs = now().second
 
-          _old_file = file_size(file)
-          old_duration = stop_secs if _old_file == '300.0 bytes' else drn(file)
+          _old_file = os.stat(file)
+          old_duration = stop_secs if _old_file.st_size == 300 else drn(file)
           duration = duration - old_duration - slept_duration
 
           slept_duration = 0
@@ -116,9 +146,12 @@ def live(bucket_name: str,
               return output
         else:
           log.warning('Unable to record because of poor network connectivity.')
-          slept_duration += camera_timeout
-          log.warning('Compensating lost time & attempting after 30 secs.')
-          time.sleep(camera_timeout)
+          delay = backoff_delay(attempt, cap=camera_timeout)
+          attempt += 1
+          slept_duration += delay
+          log.warning('Compensating lost time & attempting after '
+                      f'{delay:.1f} secs.')
+          time.sleep(delay)
     except Exception as error:
       log.critical(f'Something went wrong because of {error}')
 
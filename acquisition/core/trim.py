@@ -1,8 +1,12 @@
 """A subservice for trimming the videos."""
 
+import math
 import os
 import random
-from typing import List, Union
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
 
 from moviepy.editor import VideoFileClip as vfc
 
@@ -12,21 +16,47 @@ from acquisition.utils.local import filename, temporary_copy
 # requirements.
 
 
+@lru_cache(maxsize=2048)
+def _duration(file: str, modified: float) -> float:
+  """Returns duration of the video file for its modification time."""
+  return float(subprocess.check_output(['ffprobe', '-v', 'error',
+                                        '-show_entries', 'format=duration',
+                                        '-of', 'default=nw=1:nk=1', file]))
+
+
 def duration(file: str,
              for_humans: bool = False) -> Union[float, str, int]:
   """Returns duration of the video file."""
+  length = _duration(file, os.path.getmtime(file))
   if for_humans:
-    mins, secs = divmod(vfc(file, audio=False).duration, 60)
+    mins, secs = divmod(length, 60)
     hours, mins = divmod(mins, 60)
     return '%02d:%02d:%02d' % (hours, mins, secs)
   else:
-    return vfc(file, audio=False).duration
+    return length
+
+
+def _timestamp(seconds: Union[float, int, str]) -> str:
+  """Return secs as FFMPEG compatible HH:MM:SS.mmm timestamp."""
+  # Round to millisecs first so the secs never format as 60.000.
+  secs, millis = divmod(int(round(float(seconds) * 1000)), 1000)
+  mins, secs = divmod(secs, 60)
+  hours, mins = divmod(mins, 60)
+  return '%02d:%02d:%02d.%03d' % (hours, mins, secs, millis)
 
 
 def trim_video(file: str,
                output: str,
                start: Union[float, int, str] = 0,
-               end: Union[float, int, str] = 30) -> None:
+               end: Union[float, int, str] = 30,
+               codec_copy: bool = True,
+               target_resolution: Optional[Tuple[int, int]] = None,
+               codec: str = 'libx264',
+               bitrate: Optional[str] = None,
+               fps: Optional[int] = None,
+               audio: bool = False,
+               preset: str = 'ultrafast',
+               threads: Optional[int] = None) -> None:
   """Trims video.
 
   Trims video as per the requirements.
@@ -35,22 +65,51 @@ def trim_video(file: str,
     output: Path of the output file.
     start: Starting point (default: 0) of the video in secs.
     end: Ending point (default: 30) of the video in secs.
-    codec: Codec (default: libx264 -> .mp4) to be used while trimming.
-    bitrate: Bitrate (default: min. 400) used while trimming.
-    fps: FPS (default: 24) of the trimmed video clips.
+    codec_copy: Boolean (default: True) value to copy the video stream
+                using FFMPEG instead of re-encoding it with MoviePy.
+                Cuts are then aligned to the nearest keyframe.
+    target_resolution: Resolution (default: None) as (height, width) to
+                       downscale to while decoding. The video stream is
+                       re-encoded by FFMPEG when used with codec_copy.
+    codec: Codec (default: libx264 -> .mp4) to be used while
+           re-encoding.
+    bitrate: Bitrate (default: None -> encoder default) used while
+             re-encoding.
+    fps: FPS (default: None -> source FPS) of the re-encoded video.
     audio: Boolean (default: False) value to have audio in trimmed
-            videos.
+           videos.
     preset: The speed (default: ultrafast) used for applying the
-            compression technique on the trimmed videos.
-    threads: Number of threads (default: 15) to be used for trimming.
+            compression technique while re-encoding.
+    threads: Number of threads (default: None -> CPU count) to be used
+             while re-encoding.
   """
-  video = vfc(file, audio=False, verbose=True).subclip(start, end)
-  video.write_videofile(output, logger=None)
-  video.close()
-  try:
-    del video
-  except NameError as _nerr:
-    print(_nerr)
+  if codec_copy:
+    if target_resolution:
+      height, width = target_resolution
+      video_args = ['-vf', f'scale={width}:{height}']
+    else:
+      video_args = ['-c:v', 'copy']
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-y',
+                    '-ss', _timestamp(start), '-i', file,
+                    '-t', _timestamp(float(end) - float(start)),
+                    *video_args, *(['-c:a', 'copy'] if audio else ['-an']),
+                    '-movflags', '+faststart', output], check=True)
+    return
+  threads = threads or os.cpu_count()
+  with vfc(file, audio=audio, verbose=False,
+           target_resolution=target_resolution) as video:
+    video.subclip(start, end).write_videofile(output, codec=codec,
+                                              bitrate=bitrate, fps=fps,
+                                              audio=audio, preset=preset,
+                                              threads=threads, logger=None)
+
+
+def _trim_batch(file: str, segments: List[Tuple], threads: int) -> None:
+  """Re-encode (start, end, output) segments using a single reader."""
+  with vfc(file, audio=False) as video:
+    for start, end, output in segments:
+      video.subclip(start, end).write_videofile(output, preset='ultrafast',
+                                                threads=threads, logger=None)
 
 
 def trim_sample_section(file: str,
@@ -75,8 +134,9 @@ def trim_sample_section(file: str,
   sampling_rate = float(sampling_rate)
   temp = temporary_copy(file)
 
-  clip_length = int((duration(file) * sampling_rate * 0.01))
-  start = random.randint(1, int(duration(file) - clip_length))
+  total_length = duration(file)
+  clip_length = int((total_length * sampling_rate * 0.01))
+  start = random.randint(0, max(0, int(total_length) - clip_length))
   end = start + clip_length
   trim_video(temp, file, start, end)
   os.remove(temp)
@@ -85,7 +145,8 @@ def trim_sample_section(file: str,
 def trim_by_factor(file: str,
                    factor: str = 's',
                    clip_length: Union[float, int, str] = 30,
-                   last_clip: bool = True) -> List:
+                   last_clip: bool = True,
+                   codec_copy: bool = True) -> List:
   """Trims the video by deciding factor.
 
   Trims the video as per the deciding factor i.e. trim by mins OR trim
@@ -96,6 +157,9 @@ def trim_by_factor(file: str,
     clip_length: Length (default: 30) of each video clip.
     last_clip: Boolean (default: True) value to consider the remaining
                portion of the trimmed video.
+    codec_copy: Boolean (default: True) value to split the video in a
+                single FFMPEG segmenting pass instead of re-encoding
+                each clip with MoviePy.
     codec: Codec (default: libx264 -> .mp4) to be used while trimming.
     bitrate: Bitrate (default: min. 400) used while trimming.
     fps: FPS (default: 24) of the trimmed video clips.
@@ -105,25 +169,47 @@ def trim_by_factor(file: str,
             compression technique on the trimmed videos.
     threads: Number of threads (default: 15) to be used for trimming.
   """
-  clip_length = int(clip_length)
-  total_length = duration(file)
-  video_list = []
-  idx = 1
-  if factor == 'm':
-    start, end, clip_length = 0, clip_length * 60, clip_length * 60
+  clip_length = int(clip_length) * (60 if factor == 'm' else 1)
+  length = duration(file)
+  # Number of full clips, the remaining portion is always in (0, clip].
+  full = max(0, math.ceil(length / clip_length) - 1)
+  segments = [(idx * clip_length, (idx + 1) * clip_length,
+               filename(file, idx + 1)) for idx in range(full)]
+  if last_clip and (length - full * clip_length) > (0.7 * clip_length):
+    segments.append((full * clip_length, length, filename(file, full + 1)))
+
+  if codec_copy:
+    # Split the whole video in one pass over the input; the segment muxer
+    # cuts at the first keyframe after each of the split points, so it
+    # writes fewer files when the keyframes are sparser than the clips.
+    root, extension = os.path.splitext(file)
+    pattern = f'{root.replace("%", "%%")}_segment_%03d{extension}'
+    points = [str(end) for _, end, _ in segments if end < length]
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-y', '-i', file,
+                    '-map', '0:v', '-c', 'copy', '-an', '-f', 'segment',
+                    '-segment_times', ','.join(points) or str(length),
+                    '-reset_timestamps', '1', pattern], check=True)
+    written = []
+    while os.path.isfile(pattern % len(written)):
+      written.append(pattern % len(written))
+    outputs = [output for _, _, output in segments[:len(written)]]
+    for segment, output in zip(written, outputs):
+      os.replace(segment, output)
+    for segment in written[len(outputs):]:
+      os.remove(segment)
+    return outputs
   else:
-    start, end = 0, clip_length
-  while clip_length < total_length:
-    trim_video(file, filename(file, idx), start, end)
-    video_list.append(filename(file, idx))
-    start, end, idx = end, end + clip_length, idx + 1
-    total_length -= clip_length
-  else:
-    if last_clip:
-      start, end = (duration(file) - total_length), duration(file)
-      trim_video(file, filename(file, idx), start, end)
-
-      if duration(filename(file, idx)) > (0.7 * clip_length):
-        video_list.append(filename(file, idx))
-
-  return video_list
+    # Each clip is encoded by its own FFMPEG writer process, hence the
+    # clips are cut concurrently across the available cores. Every worker
+    # reuses one reader over a contiguous batch of increasing start times.
+    workers = max(1, min(len(segments), os.cpu_count() or 1))
+    size = math.ceil(len(segments) / workers)
+    batches = [segments[idx:idx + size]
+               for idx in range(0, len(segments), size)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+      # Split the encoder threads so the workers don't oversubscribe.
+      threads = max(1, (os.cpu_count() or 1) // workers)
+      list(executor.map(lambda batch: _trim_batch(file, batch, threads),
+                        batches))
+
+  return [output for _, _, output in segments]
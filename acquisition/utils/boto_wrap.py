@@ -1,33 +1,128 @@
 """Utility for work as a wrapper around Amazon's Boto3 API."""
 
+import binascii
 import csv
+import hashlib
+import io
 import itertools
 import logging
 import math
+import mmap
 import os
 import time
-from collections import defaultdict
-from datetime import datetime
-from typing import List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 import boto3
-import pytz
-from botocore.exceptions import ClientError, NoCredentialsError
-from botocore.utils import calculate_tree_hash
-
-from acquisition.utils.common import check_internet, file_size
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import (ClientError, ConnectionClosedError,
+                                 EndpointConnectionError, NoCredentialsError)
+
+from acquisition.utils.common import (backoff_delay, check_internet,
+                                      convert_bytes, timestamp_dirname)
 from acquisition.utils.logs import log
 from acquisition.utils.paths import videos
 
-video_file_extensions = ('.3gp', '.mp4', '.avi', '.webm', '.divx', '.f4v',
-                         '.flv', '.m4v', '.mpg', '.mts', '.mxf', '.ogm', '.qt',
-                         '.vob', '.wmv', '.3g2', '.3gpp', '.mov', '.mkv',
-                         '.h265', '.ogv', '.ts', '.dat', '.m2ts', '.m2v',
-                         '.3GP', '.MP4', '.AVI', '.WEBM', '.DIVX', '.F4V',
-                         '.FLV', '.M4V', '.MPG', '.MTS', '.MXF', '.OGM', '.QT',
-                         '.VOB', '.WMV', '.3G2', '.3GPP', '.MOV', '.MKV',
-                         '.OGV', '.TS', '.DAT', '.M2TS', '.M2V', '.H265',
-                         '.265')
+video_file_extensions = frozenset(['.3gp', '.mp4', '.avi', '.webm', '.divx',
+                                   '.f4v', '.flv', '.m4v', '.mpg', '.mts',
+                                   '.mxf', '.ogm', '.qt', '.vob', '.wmv',
+                                   '.3g2', '.3gpp', '.mov', '.mkv', '.h265',
+                                   '.ogv', '.ts', '.dat', '.m2ts', '.m2v',
+                                   '.265'])
+
+
+def is_video(file_name: str) -> bool:
+  """Return True if the file has a video extension, in any case."""
+  return os.path.splitext(file_name)[1].lower() in video_file_extensions
+
+
+# Credentials for the buckets owned by the acquisition engine.
+AWS_ACCESS_KEY = os.getenv('AWS_ACCESS_KEY', 'XAMES3')
+AWS_SECRET_KEY = os.getenv('AWS_SECRET_KEY', 'XAMES3')
+
+# S3 Transfer Acceleration, enabled only for buckets configured for it.
+S3_ACCELERATE = os.getenv('AWS_S3_ACCELERATE', '').lower() in ('1', 'true')
+
+# Client configuration shared by all the sheep threads.
+client_config = Config(retries={'max_attempts': 10, 'mode': 'adaptive'},
+                       max_pool_connections=32,
+                       s3={'use_accelerate_endpoint': S3_ACCELERATE})
+
+# Multipart transfer configuration for streaming large recordings from
+# disk in parallel 16 MB parts.
+_MB = 1024 * 1024
+transfer_config = TransferConfig(multipart_threshold=8 * _MB,
+                                 multipart_chunksize=16 * _MB,
+                                 max_concurrency=16,
+                                 use_threads=True)
+
+
+@lru_cache(maxsize=16)
+def aws_client(access_key: str,
+               secret_key: str,
+               service: str = 's3',
+               region: str = None):
+  """Return a cached, thread-safe AWS client for the credentials.
+
+  Creating a client loads botocore's service model and sets up a new
+  connection pool, hence the client is built once per credentials,
+  service and region and shared across threads.
+  """
+  return boto3.client(service,
+                      aws_access_key_id=access_key,
+                      aws_secret_access_key=secret_key,
+                      region_name=region,
+                      config=client_config)
+
+
+# Error codes worth retrying since they are raised by throttling or
+# transient failures on AWS's end.
+_TRANSIENT_ERRORS = frozenset(['SlowDown', 'RequestTimeout', 'InternalError',
+                               'ServiceUnavailable', 'Throttling',
+                               'ThrottlingException', '500', '503'])
+
+
+def _is_transient(error: Exception) -> bool:
+  """Return True if the AWS error is worth retrying."""
+  if isinstance(error, S3UploadFailedError):
+    # Managed uploads wrap the underlying error raised by the client.
+    error = error.__cause__ or error.__context__
+  if isinstance(error, (ConnectionClosedError, EndpointConnectionError)):
+    return True
+  if isinstance(error, ClientError):
+    return error.response.get('Error', {}).get('Code') in _TRANSIENT_ERRORS
+  return False
+
+
+def with_retry(func: Callable,
+               *args: Any,
+               attempts: int = 5,
+               **kwargs: Any) -> Any:
+  """Call AWS function and retry it on transient failures.
+
+  Args:
+    func: Boto3 function to call.
+    attempts: Number of tries (default: 5) before giving up.
+
+  Returns:
+    Value returned by the function.
+
+  Notes:
+    The client already retries individual API calls, this covers the
+    managed transfers which span multiple calls.
+  """
+  for attempt in range(attempts):
+    try:
+      return func(*args, **kwargs)
+    except (ClientError, ConnectionClosedError, EndpointConnectionError,
+            S3UploadFailedError) as error:
+      if not _is_transient(error) or attempt == attempts - 1:
+        raise
+    time.sleep(backoff_delay(attempt, base=0.25, cap=30.0))
 
 
 def create_s3_bucket(access_key: str,
@@ -52,10 +147,7 @@ def create_s3_bucket(access_key: str,
     Boolean value, True if bucket created.
   """
   try:
-    s3 = boto3.client('s3',
-                      aws_access_key_id=access_key,
-                      aws_secret_access_key=secret_key,
-                      region_name=region)
+    s3 = aws_client(access_key, secret_key, 's3', region)
   except (ClientError, NoCredentialsError):
     log.error('Wrong credentials used to access the AWS account.')
     return False
@@ -92,9 +184,7 @@ def upload_to_bucket(access_key: str,
     Public IP address of the uploaded file.
   """
   try:
-    s3 = boto3.client('s3',
-                      aws_access_key_id=access_key,
-                      aws_secret_access_key=secret_key)
+    s3 = aws_client(access_key, secret_key)
   except (ClientError, NoCredentialsError):
     log.error('Wrong credentials used to access the AWS account.')
     return None
@@ -110,9 +200,10 @@ def upload_to_bucket(access_key: str,
 
     while True:
       if check_internet(log):
-        s3.upload_file(filename, bucket_name, s3_name,
-                        ExtraArgs={'ACL': 'public-read',
-                                  'ContentType': 'video/mp4'})
+        with_retry(s3.upload_file, filename, bucket_name, s3_name,
+                   ExtraArgs={'ACL': 'public-read',
+                              'ContentType': 'video/mp4'},
+                   Config=transfer_config)
         log.info(f'{s3_name} file uploaded on to Amazon S3 bucket.')
         break
       else:
@@ -158,9 +249,7 @@ def check_file(access_key: str,
     List of boolean status, bucket and filename.
   """
   try:
-    s3 = boto3.client('s3',
-                      aws_access_key_id=access_key,
-                      aws_secret_access_key=secret_key)
+    s3 = aws_client(access_key, secret_key)
   except (ClientError, NoCredentialsError):
     log.error('Wrong credentials used to access the AWS account.')
     return None
@@ -197,9 +286,7 @@ def access_file(access_key: str,
     None.
   """
   try:
-    s3 = boto3.client('s3',
-                      aws_access_key_id=access_key,
-                      aws_secret_access_key=secret_key)
+    s3 = aws_client(access_key, secret_key)
   except (ClientError, NoCredentialsError):
     log.error('Wrong credentials used to access the AWS account.')
     return None, '[e] Error while downloading file'
@@ -208,12 +295,15 @@ def access_file(access_key: str,
                                          s3_url, log, bucket_name)
 
     if status[0]:
-      s3.download_file(bucket,
-                       file,
-                       os.path.join(videos, f'{file_name}.mp4'))
+      with_retry(s3.download_file,
+                 bucket,
+                 file,
+                 os.path.join(videos, f'{file_name}.mp4'),
+                 Config=transfer_config)
       log.info(f'File "{file_name}.mp4" downloaded from Amazon S3 storage.')
 
-      if file_size(os.path.join(videos, f'{file_name}.mp4')).endswith('KB'):
+      # Anything under a MB can't hold a usable recording.
+      if os.stat(os.path.join(videos, f'{file_name}.mp4')).st_size < _MB:
         log.error('Unusable file downloaded since file size is in KBs.')
         return None, '[w] Unusable file downloaded.'
 
@@ -240,8 +330,7 @@ def save_file(bucket_name: str, filename: str) -> str:
     If the `./videos/` folder doesn't exists, it creates one and
     proceeds further with it.
   """
-  if not os.path.isdir(os.path.join(videos, bucket_name)):
-    os.makedirs(os.path.join(videos, bucket_name))
+  os.makedirs(os.path.join(videos, bucket_name), exist_ok=True)
   return os.path.join(os.path.join(videos, bucket_name), filename)
 
 
@@ -271,9 +360,7 @@ def copy_file_from_bucket(access_key: str,
     are publicly available.
   """
   try:
-    s3 = boto3.resource('s3',
-                        aws_access_key_id=access_key,
-                        aws_secret_access_key=secret_key)
+    s3 = aws_client(access_key, secret_key)
   except (ClientError, NoCredentialsError):
     log.error('Wrong credentials used to access the AWS account.')
     return None
@@ -282,7 +369,8 @@ def copy_file_from_bucket(access_key: str,
         'Bucket': customer_bucket_name,
         'Key': customer_obj_key
     }
-    s3.meta.client.copy(copy_source, bucket_name, bucket_obj_key)
+    with_retry(s3.copy, copy_source, bucket_name, bucket_obj_key,
+               Config=transfer_config)
     return True
 
 
@@ -310,19 +398,73 @@ def create_glacier_vault(access_key: str,
     Boolean value, True if the vault is created.
   """
   try:
-    glacier = boto3.resource('glacier',
-                             aws_access_key_id=access_key,
-                             aws_secret_access_key=secret_key,
-                             region_name=region)
+    glacier = aws_client(access_key, secret_key, 'glacier', region)
   except (ClientError, NoCredentialsError):
     log.error('Wrong credentials used to access the AWS account.')
     return False
   else:
-    glacier.Vault(account_id, vault_name).create()
+    glacier.create_vault(accountId=account_id, vaultName=vault_name)
     log.info('Vault created on Amazon S3 Glacier.')
     return True
 
 
+class _PartReader(io.RawIOBase):
+  """Seekable file object reading an archive part straight off the map.
+
+  Glacier parts are sliced out of the memory mapped archive as views,
+  so the part is sent without first being copied into a bytes object.
+  """
+
+  def __init__(self, view: memoryview) -> None:
+    self._view = view
+    self._position = 0
+
+  def readable(self) -> bool:
+    return True
+
+  def seekable(self) -> bool:
+    return True
+
+  def tell(self) -> int:
+    return self._position
+
+  def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+    if whence == io.SEEK_CUR:
+      offset += self._position
+    elif whence == io.SEEK_END:
+      offset += len(self._view)
+    self._position = max(0, offset)
+    return self._position
+
+  def readinto(self, buffer) -> int:
+    chunk = self._view[self._position:self._position + len(buffer)]
+    buffer[:len(chunk)] = chunk
+    self._position += len(chunk)
+    return len(chunk)
+
+
+def _leaf_hashes(body: memoryview) -> List[bytes]:
+  """Return SHA-256 digests of every 1 MB chunk of the archive part."""
+  return [hashlib.sha256(body[idx:idx + _MB]).digest()
+          for idx in range(0, len(body), _MB)]
+
+
+def _tree_hash(leaves: List[bytes]) -> str:
+  """Return S3 Glacier tree hash built from the 1 MB leaf digests.
+
+  This is the same checksum as `botocore.utils.calculate_tree_hash()`,
+  but built from the digests computed while uploading the parts so the
+  archive isn't read again.
+  """
+  if not leaves:
+    return hashlib.sha256(b'').hexdigest()
+  while len(leaves) > 1:
+    leaves = [hashlib.sha256(b''.join(leaves[idx:idx + 2])).digest()
+              if idx + 1 < len(leaves) else leaves[idx]
+              for idx in range(0, len(leaves), 2)]
+  return binascii.hexlify(leaves[0]).decode('ascii')
+
+
 def upload_to_vault(access_key: str,
                     secret_key: str,
                     vault_name: str,
@@ -348,10 +490,7 @@ def upload_to_vault(access_key: str,
   # You can find the reference code here:
   # https://stackoverflow.com/a/52602270
   try:
-    glacier = boto3.client('glacier',
-                           aws_access_key_id=access_key,
-                           aws_secret_access_key=secret_key,
-                           region_name=region)
+    glacier = aws_client(access_key, secret_key, 'glacier', region)
   except (ClientError, NoCredentialsError):
     log.error('Wrong credentials used to access the AWS account.')
     return None
@@ -374,22 +513,39 @@ def upload_to_vault(access_key: str,
     file_size = os.path.getsize(file_name)
     multiple_parts = math.ceil(file_size / upload_chunk)
 
-    with open(file_name, 'rb') as upload_archive:
-      for idx in range(multiple_parts):
-        min_size = idx * upload_chunk
-        max_size = min_size + upload_chunk - 1
-
-        if max_size > file_size:
-          max_size = (file_size - min_size) + min_size - 1
-        file_part = upload_archive.read(upload_chunk)
-        mp_part(vaultName=vault_name,
-                uploadId=multipart_archive_upload['uploadId'],
+    upload_id = multipart_archive_upload['uploadId']
+    parts = [(idx * upload_chunk,
+              min(idx * upload_chunk + upload_chunk, file_size) - 1)
+             for idx in range(multiple_parts)]
+
+    # An empty archive can't be memory mapped, its tree hash is the
+    # digest of no data.
+    checksum = _tree_hash([])
+    if file_size:
+      with open(file_name, 'rb') as upload_archive, \
+              mmap.mmap(upload_archive.fileno(), 0,
+                        access=mmap.ACCESS_READ) as archive_map:
+
+        def _upload_part(part: Tuple[int, int]) -> List[bytes]:
+          min_size, max_size = part
+          # The view is released before the map is closed, as exported
+          # buffers would otherwise keep the map from closing.
+          with memoryview(archive_map)[min_size:max_size + 1] as body:
+            with_retry(lambda: mp_part(
+                vaultName=vault_name,
+                uploadId=upload_id,
                 range=f'bytes {min_size}-{max_size}/{file_size}',
-                body=file_part)
+                body=_PartReader(body)))
+            return _leaf_hashes(body)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+          leaves = [leaf
+                    for part in executor.map(_upload_part, parts)
+                    for leaf in part]
+        checksum = _tree_hash(leaves)
 
-    checksum = calculate_tree_hash(open(file_name, 'rb'))
     complete_upload = cp_upload(vaultName=vault_name,
-                                uploadId=multipart_archive_upload['uploadId'],
+                                uploadId=upload_id,
                                 archiveSize=str(file_size),
                                 checksum=checksum)
 
@@ -397,13 +553,45 @@ def upload_to_vault(access_key: str,
     return complete_upload
 
 
+def _download_s3_file(s3,
+                      bucket_name: str,
+                      s3_file: str,
+                      file_name: str,
+                      timestamp: datetime,
+                      log: logging.Logger) -> None:
+  """Download S3 file and stamp it with the S3 modification time.
+
+  The files are downloaded concurrently, hence their modification time
+  is set to the S3 one to keep the order used while concatenating them.
+  """
+  with_retry(s3.download_file, bucket_name, s3_file, file_name)
+  os.utime(file_name, (timestamp.timestamp(), timestamp.timestamp()))
+  log.info(f'File "{s3_file}" downloaded from Amazon S3.')
+
+
+def _date_prefixes(limit_from: datetime,
+                   limit_till: datetime,
+                   prefix_format: str = None) -> List[str]:
+  """Return key prefixes for every day in the timeframe.
+
+  Returns a single empty prefix, i.e. the whole bucket, if no format is
+  given.
+  """
+  if prefix_format is None:
+    return ['']
+  days = (limit_till.date() - limit_from.date()).days
+  prefixes = (limit_from + timedelta(days=idx) for idx in range(days + 1))
+  return list(dict.fromkeys(idx.strftime(prefix_format) for idx in prefixes))
+
+
 def access_limited_files(access_key: str,
                          secret_key: str,
                          bucket_name: str,
                          access_from: str,
                          access_to: str,
                          log: logging.Logger,
-                         timestamp_format: str = '%Y-%m-%d %H:%M:%S') -> List:
+                         timestamp_format: str = '%Y-%m-%d %H:%M:%S',
+                         prefix_format: str = None) -> List:
   """Access files from S3 bucket for particular timeframe.
 
   Access and download file from S3 bucket for particular timeframe.
@@ -416,67 +604,72 @@ def access_limited_files(access_key: str,
     access_to: Datetime till when to fetch files.
     log: Logger object for logging the status.
     timestamp_format: Timestamp format (default: %Y-%m-%d %H:%M:%S)
+    prefix_format: Date format (default: None) of the key prefix, eg:
+                   '%Y/%m/%d/', to list only the days in the timeframe.
 
   Returns:
     List of the directories which hosts the downloaded files.
   """
   _glob = []
   try:
-    s3 = boto3.client('s3',
-                      aws_access_key_id=access_key,
-                      aws_secret_access_key=secret_key)
+    s3 = aws_client(access_key, secret_key)
   except (ClientError, NoCredentialsError):
     log.error('Wrong credentials used to access the AWS account.')
     return []
   else:
     limit_from = datetime.strptime(
-        access_from, timestamp_format).replace(tzinfo=pytz.UTC)
+        access_from, timestamp_format).replace(tzinfo=timezone.utc)
     limit_till = datetime.strptime(
-        access_to, timestamp_format).replace(tzinfo=pytz.UTC)
+        access_to, timestamp_format).replace(tzinfo=timezone.utc)
     bucket_dir = os.path.join(videos, bucket_name)
-    concate_dir = []
-    files_with_timestamp = {}
-
-    all_files = s3.list_objects_v2(Bucket=bucket_name)
-    unsupported = [idx['Key']
-                   for idx in all_files['Contents']
-                   if not idx['Key'].endswith(video_file_extensions)]
-    unsupported = list(set(map(lambda x: os.path.splitext(x)[1], unsupported)))
-    unsupported = [idx for idx in unsupported if idx != '']
-
+    concate_dir, selected = set(), []
+    in_range, unsupported = [], set()
+
+    paginator = s3.get_paginator('list_objects_v2')
+    pages = itertools.chain.from_iterable(
+        paginator.paginate(Bucket=bucket_name, Prefix=prefix)
+        for prefix in _date_prefixes(limit_from, limit_till, prefix_format))
+    for page in pages:
+      for obj in page.get('Contents', []):
+        extension = os.path.splitext(obj['Key'])[1]
+        if extension.lower() in video_file_extensions:
+          if limit_from < obj['LastModified'] < limit_till:
+            in_range.append((obj['Key'], obj['LastModified']))
+        elif extension:
+          unsupported.add(extension)
+
+    unsupported = sorted(unsupported)
     if len(unsupported) > 1:
       log.info(f'Unsupported video formats like "{unsupported[0]}", '
                f'"{unsupported[1]}", etc. will be skipped.')
-    else:
+    elif unsupported:
       log.info(f'Files ending with "{unsupported[0]}" will be skipped.')
 
-    for files in all_files['Contents']:
-      if files['Key'].endswith(video_file_extensions):
-        files_with_timestamp[files['Key']] = files['LastModified']
+    # No sorting needed, concate_videos() orders the clips by the S3
+    # modification time stamped on each download.
+    for file, timestamp in in_range:
+      s3_style_dir = os.path.join(bucket_dir, os.path.dirname(file))
+      if s3_style_dir not in concate_dir:
+        os.makedirs(s3_style_dir, exist_ok=True)
+        concate_dir.add(s3_style_dir)
+      _glob.append(os.path.join(s3_style_dir, os.path.basename(file)))
+      selected.append((file, _glob[-1], timestamp))
 
-    sorted_files = sorted(files_with_timestamp.items(), key=lambda xa: xa[1])
-
-    for file, timestamp in sorted_files:
-      if timestamp > limit_from and timestamp < limit_till:
-        s3_style_dir = os.path.join(bucket_dir, os.path.dirname(file))
-        concate_dir.append(s3_style_dir)
-        if not os.path.isdir(s3_style_dir):
-          os.makedirs(s3_style_dir)
-        s3.download_file(bucket_name, file,
-                         os.path.join(s3_style_dir, os.path.basename(file)))
-        log.info(f'File "{file}" downloaded from Amazon S3.')
-        _glob.append(os.path.join(s3_style_dir, os.path.basename(file)))
+    with ThreadPoolExecutor(max_workers=16) as executor:
+      list(executor.map(lambda args: _download_s3_file(s3, bucket_name, *args,
+                                                       log=log), selected))
 
     if len(concate_dir) > 0:
-      sizes = [file_size(s_idx) for s_idx in _glob]
-      temp = [(n, s) for n, s in zip(_glob, sizes)]
-      with open(os.path.join(bucket_dir, f'{bucket_name}.csv'), 'a',
+      sizes = [os.stat(s_idx).st_size for s_idx in _glob]
+      temp = [(n, convert_bytes(s)) for n, s in zip(_glob, sizes)]
+      csv_name = f'{bucket_name}_{timestamp_dirname()}.csv'
+      with open(os.path.join(bucket_dir, csv_name), 'w', newline='',
                 encoding="utf-8") as csv_file:
         log.info('Logging downloaded files into a CSV file.')
         _file = csv.writer(csv_file, quoting=csv.QUOTE_MINIMAL)
         _file.writerow(['Files', 'Size on disk'])
         _file.writerows(temp)
-      return list(set(concate_dir))
+      return list(concate_dir)
 
     else:
       return []
@@ -501,9 +694,7 @@ def analyze_storage_consumed(access_key: str,
     Storage file size of a customer on S3.
   """
   try:
-    s3 = boto3.resource('s3',
-                        aws_access_key_id=access_key,
-                        aws_secret_access_key=secret_key)
+    s3 = aws_client(access_key, secret_key)
   except (ClientError, NoCredentialsError):
     log.error('Wrong credentials used to access the AWS account.')
     return 'Error'
@@ -515,29 +706,20 @@ def analyze_storage_consumed(access_key: str,
 
     log.debug(f'Calculating storage size used by "{customer_id}"...')
 
-    all_buckets = [bucket.name for bucket in s3.buckets.all()]
-    all_customers = list(map(lambda x: x[2:].isdigit()
-                             if len(x) == 6 else False,
-                             all_buckets))
-
-    valid_customers = list(itertools.compress(all_buckets, all_customers))
-    customers = [(idx[2:6], idx) for idx in valid_customers]
-    customer = defaultdict(list)
-
-    for k, v in customers:
-      customer[k].append(v)
-
-    size = 0
-    bucket = s3.Bucket(customer[customer_id][0])
-
-    for obj in bucket.objects.all():
-      if not contract_id:
-        size += obj.size
-      elif contract_id and order_id:
-        if f'{customer_id}{contract_id}{order_id}' in obj.key:
-          size += obj.size
-      else:
-        if f'{customer_id}{contract_id}' in obj.key:
-          size += obj.size
+    # Customer buckets are named as "<country code><customer id>".
+    bucket = next(idx['Name'] for idx in s3.list_buckets()['Buckets']
+                  if len(idx['Name']) == 6 and idx['Name'][2:] == customer_id)
+
+    # Objects are keyed after the bucket name followed by the contract and
+    # order ids, hence the filtering is done by S3 using the key prefix.
+    prefix = ''
+    if contract_id:
+      prefix = f'{bucket}{contract_id}{order_id or ""}'
+
+    pages = s3.get_paginator('list_objects_v2').paginate(Bucket=bucket,
+                                                        Prefix=prefix)
+    size = sum(obj['Size']
+               for page in pages
+               for obj in page.get('Contents', []))
 
     return f'{round((size * 100) / 5e+12, 5)}'
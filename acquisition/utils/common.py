@@ -2,28 +2,83 @@
 
 import logging
 import os
+import random
 import socket
-from datetime import datetime
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional, Union
 
 import pytz
 
 
-def check_internet(log: logging.Logger, 
-                   timeout: Union[float, int] = 10.0) -> bool:
-  """Check the internet connectivity."""
+# Monotonic timestamp of the last successful connectivity check.
+_internet_checked_at = None
+
+
+def check_internet(log: logging.Logger,
+                   timeout: Union[float, int] = 10.0,
+                   ttl: Union[float, int] = 5.0) -> bool:
+  """Check the internet connectivity.
+
+  A successful check is cached for `ttl` secs so that back to back
+  calls do not pay for a new TCP handshake. Failed checks are never
+  cached.
+  """
+  global _internet_checked_at
+  if (_internet_checked_at is not None and
+          time.monotonic() - _internet_checked_at < ttl):
+    return True
   # You can find the reference code here:
   # https://gist.github.com/yasinkuyu/aa505c1f4bbb4016281d7167b8fa2fc2
   try:
-    socket.create_connection(('www.google.com', 80), timeout=timeout)
+    # Connecting to a public DNS resolver by IP skips the name lookup.
+    with socket.create_connection(('1.1.1.1', 53), timeout=timeout):
+      pass
+    _internet_checked_at = time.monotonic()
     log.debug('Internet connection available.')
     return True
   except OSError:
-    pass
+    _internet_checked_at = None
   log.warning('Internet connection unavailable.')
   return False
 
 
+def backoff_delay(attempt: int,
+                  base: Union[float, int] = 1.0,
+                  cap: Union[float, int] = 60.0) -> float:
+  """Return capped exponential backoff delay in secs with jitter.
+
+  Args:
+    attempt: Zero-based retry attempt number.
+    base: Base delay (default: 1.0) in secs.
+    cap: Maximum delay (default: 60.0) in secs before jitter.
+
+  Returns:
+    Delay in secs randomized between 50% and 150% of the capped value.
+  """
+  return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+def scp(password: str, source: str, destination: str, *options: str) -> int:
+  """Copy source to destination using scp and return the exit code.
+
+  The password is handed to `sshpass` through the environment so it
+  doesn't show up in the process list, and the SSH connection is kept
+  open for a minute so that the following copies to or from the same
+  host skip the SSH handshake.
+  """
+  control_path = os.path.join(tempfile.gettempdir(), 'acquisition-ssh-%C')
+  return subprocess.run(['sshpass', '-e', 'scp',
+                         '-o', 'ControlMaster=auto',
+                         '-o', f'ControlPath={control_path}',
+                         '-o', 'ControlPersist=60',
+                         *options, source, destination],
+                        env=dict(os.environ, SSHPASS=password)).returncode
+
+
 def now() -> datetime:
   """Return current time without microseconds."""
   return datetime.now().replace(microsecond=0)
@@ -31,7 +86,7 @@ def now() -> datetime:
 
 def utc_now() -> datetime:
   """Return UTC time without microseconds."""
-  return datetime.now(pytz.utc).replace(microsecond=0)
+  return datetime.now(timezone.utc).replace(microsecond=0)
 
 
 def convert_bytes(number: Union[float, int]) -> Optional[str]:
@@ -62,6 +117,12 @@ def timestamp_dirname(ts_format: str = '%d_%m_%Y_%H_%M_%S') -> str:
   return str(now().strftime(ts_format))
 
 
+@lru_cache(maxsize=4096)
+def _parse_timestamp(timestamp: str, timestamp_format: str) -> datetime:
+  """Return parsed timestamp, cached since strptime() is slow."""
+  return datetime.strptime(timestamp, timestamp_format)
+
+
 def calculate_duration(start_time: str,
                        end_time: str,
                        timestamp_format: str = '%Y-%m-%d %H:%M:%S',
@@ -81,12 +142,11 @@ def calculate_duration(start_time: str,
     Timedelta in secs.
   """
   if turntable_mode:
-    _start_time = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S')
-    _end_time = datetime.strptime(end_time, '%Y-%m-%d %H:%M:%S')
-  else:
-    _start_time = datetime.strptime(start_time, timestamp_format)
-    _end_time = datetime.strptime(end_time, timestamp_format)
-  return float((_end_time - _start_time).seconds)
+    timestamp_format = '%Y-%m-%d %H:%M:%S'
+  delta = (_parse_timestamp(end_time, timestamp_format) -
+           _parse_timestamp(start_time, timestamp_format)).total_seconds()
+  # An end time earlier than the start time rolls over to the next day.
+  return delta % 86400.0 if delta < 0 else delta
 
 
 def seconds_to_datetime(second: int) -> str:
@@ -100,5 +160,6 @@ def datetime_to_utc(timestamp: str,
                     timezone: str,
                     timestamp_format: str = '%Y-%m-%d %H:%M:%S') -> str:
   """Convert timezone specific timestamp to UTC time."""
-  local = datetime.strptime(timestamp, timestamp_format)
-  return str(pytz.timezone(timezone).localize(local).astimezone(pytz.utc))[:-6]
+  local = pytz.timezone(timezone).localize(
+      datetime.strptime(timestamp, timestamp_format))
+  return local.astimezone(pytz.utc).strftime('%Y-%m-%d %H:%M:%S')
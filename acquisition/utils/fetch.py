@@ -5,38 +5,55 @@ import ftplib
 import glob
 import logging
 import os
+import posixpath
+import queue
 import re
 import shutil
-from datetime import datetime, timedelta
-from typing import List, Optional, Tuple, Union
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple, Union
 from urllib.parse import unquote, urlsplit
 from uuid import uuid4
 
-import pytz
 import requests
 from azure.storage.blob import BlobClient, ContainerClient
-from requests.exceptions import RequestException
-from urllib3.exceptions import RequestError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ChunkedEncodingError, RequestException, Timeout
+from urllib3.exceptions import ProtocolError, ReadTimeoutError, RequestError
+from urllib3.util.retry import Retry
 
 from acquisition.core.concate import concate_videos
 from acquisition.core.trim import trim_by_factor
-from acquisition.utils.boto_wrap import (access_limited_files,
-                                         upload_to_bucket,
-                                         video_file_extensions)
-from acquisition.utils.common import file_size
+from acquisition.utils.boto_wrap import (AWS_ACCESS_KEY, AWS_SECRET_KEY,
+                                         access_limited_files,
+                                         is_video, upload_to_bucket)
+from acquisition.utils.common import backoff_delay, convert_bytes, scp
 from acquisition.utils.paths import videos
 
-# pyright: reportInvalidStringEscapeSequence=false
-check_file = re.compile("^(\/+\w{0,}){0,}\.\w{1,}$")
-check_directory = re.compile("^(\/+\w{0,}){0,}$")
+check_file = re.compile(r'^(/+\w*)*\.\w+$')
+check_directory = re.compile(r'^(/+\w*)*$')
 
 # This url is used for downloading files from Google Drive.
 DRIVE_DOWNLOAD_URL = 'https://docs.google.com/uc?export=download'
-# Chunk size
-CHUNK_SIZE = 32768
-# Credentials
-_AWS_ACCESS_KEY = 'XAMES3'
-_AWS_SECRET_KEY = 'XAMES3'
+# Chunk size (1 MB) for copying downloads to the disk.
+CHUNK_SIZE = 1 << 20
+# Downloads smaller than this (1 MB) can't hold a usable recording.
+MIN_FILE_SIZE = 1 << 20
+
+# Shared session for reusing keep-alive connections across downloads
+# instead of paying for a fresh TCP and TLS handshake for every file.
+_SESSION = requests.Session()
+for _scheme in ('http://', 'https://'):
+  _SESSION.mount(_scheme, HTTPAdapter(pool_connections=32,
+                                      pool_maxsize=32,
+                                      max_retries=Retry(
+                                          total=5,
+                                          backoff_factor=0.5,
+                                          status_forcelist=(500, 502, 503,
+                                                            504),
+                                          respect_retry_after_header=True)))
+
 
 def filename_from_url(public_url: str) -> str:
   """Returns filename from public url.
@@ -51,13 +68,61 @@ def filename_from_url(public_url: str) -> str:
     ValueError: If the url has arbitrary characters.
   """
   url_path = urlsplit(public_url).path
-  basename = os.path.basename(unquote(url_path))
-  if (os.path.basename(basename) != basename
-      or unquote(os.path.basename(url_path)) != basename):
+  basename = unquote(os.path.basename(url_path))
+  # An encoded slash would change the basename once unquoted.
+  if '/' in basename:
     raise ValueError('[e] URL has invalid characters. Cannot parse the same.')
   return basename
 
 
+def _stream_to_file(url: str,
+                    file_name: str,
+                    params: dict = None,
+                    response: requests.Response = None,
+                    attempts: int = 5) -> None:
+  """Stream the url to the file, resuming it if the connection drops.
+
+  Args:
+    url: Url of the file.
+    file_name: Path for saving the file.
+    params: Query parameters (default: None) for the request.
+    response: Already opened streaming response (default: None) to
+              start with.
+    attempts: Number of tries (default: 5) before giving up.
+
+  Notes:
+    The body is copied to the disk in chunks instead of buffering the
+    entire video in memory. On a dropped connection, the download is
+    resumed from the bytes already written using a range request.
+  """
+  for attempt in range(attempts):
+    offset, headers = 0, {}
+    if attempt and os.path.isfile(file_name):
+      offset = os.path.getsize(file_name)
+      headers['Range'] = f'bytes={offset}-'
+    try:
+      if response is None:
+        response = _SESSION.get(url,
+                                params=params,
+                                headers=headers,
+                                stream=True,
+                                timeout=(5, 60))
+      with response:
+        response.raise_for_status()
+        # Servers ignoring the range send the entire file again.
+        mode = 'ab' if offset and response.status_code == 206 else 'wb'
+        with open(file_name, mode) as file:
+          response.raw.decode_content = True
+          shutil.copyfileobj(response.raw, file, length=CHUNK_SIZE)
+      return
+    except (ChunkedEncodingError, ProtocolError, ReadTimeoutError, Timeout,
+            requests.ConnectionError):
+      if attempt == attempts - 1:
+        raise
+      response = None
+      time.sleep(backoff_delay(attempt))
+
+
 def download_from_url(public_url: str,
                       filename: str = None,
                       download_path: str = videos) -> Tuple:
@@ -85,13 +150,11 @@ def download_from_url(public_url: str,
     `download_from_google_drive()`.
   """
   try:
-    download_item = requests.get(public_url, stream=True)
     if filename is None:
       filename = filename_from_url(public_url)
-    with open(os.path.join(download_path, filename), 'wb') as file:
-      file.write(download_item.content)
-      return True, os.path.join(download_path, filename)
-  except (RequestError, RequestException):
+    _stream_to_file(public_url, os.path.join(download_path, filename))
+    return True, os.path.join(download_path, filename)
+  except (ProtocolError, RequestError, RequestException):
     return None, '[e] Error while downloading file'
 
 
@@ -139,22 +202,23 @@ def download_from_google_drive(shareable_url: str,
     else:
       file_id = shareable_url.split('https://drive.google.com/open?id=')[1]
 
-    session = requests.Session()
-    response = session.get(DRIVE_DOWNLOAD_URL,
-                           params={'id': file_id},
-                           stream=True)
+    params = {'id': file_id}
+    response = _SESSION.get(DRIVE_DOWNLOAD_URL,
+                            params=params,
+                            stream=True,
+                            timeout=(5, 60))
     token = fetch_confirm_token(response)
     if token:
-      response = session.get(DRIVE_DOWNLOAD_URL,
-                             params={'id': file_id, 'confirm': token},
-                             stream=True)
+      response.close()
+      params['confirm'] = token
+      response = None
     # Write file to the disk.
-    with open(os.path.join(download_path, f'{file_name}.mp4'), 'wb') as file:
-      for chunk in response.iter_content(CHUNK_SIZE):
-        if chunk:
-          file.write(chunk)
+    _stream_to_file(DRIVE_DOWNLOAD_URL,
+                    os.path.join(download_path, f'{file_name}.mp4'),
+                    params, response)
     log.info(f'File "{file_name}.mp4" downloaded from Google Drive.')
-    if file_size(os.path.join(download_path, f'{file_name}.mp4')).endswith('KB'):
+    if os.stat(os.path.join(download_path,
+                            f'{file_name}.mp4')).st_size < MIN_FILE_SIZE:
       log.error('Unusable file downloaded since file size is in KBs.')
       return None, '[w] Unusable file downloaded.'
     return True, os.path.join(download_path, f'{file_name}.mp4')
@@ -206,10 +270,13 @@ def download_from_azure(account_name: str,
                                              container_name=container_name,
                                              blob_name=blob_name)
     with open(os.path.join(download_path, f'{file_name}.mp4'), 'wb') as file:
-      data = blob.download_blob()
+      # Blobs larger than the SDK's first GET (32 MB) are fetched as
+      # parallel range requests.
+      data = blob.download_blob(max_concurrency=8)
       data.readinto(file)
     log.info(f'File "{file_name}.mp4" downloaded from Microsoft Azure.')
-    if file_size(os.path.join(download_path, f'{file_name}.mp4')).endswith('KB'):
+    if os.stat(os.path.join(download_path,
+                            f'{file_name}.mp4')).st_size < MIN_FILE_SIZE:
       log.error('Unusable file downloaded since file size is in KBs.')
       return None, '[w] Unusable file downloaded.'
     return True, os.path.join(download_path, f'{file_name}.mp4')
@@ -258,24 +325,24 @@ def download_using_ftp(username: str,
   addr_type = len(parts) == 4 and all(0 <= int(part) < 256 for part in parts)
 
   try:
-    if remote_file.endswith(video_file_extensions):
+    if is_video(remote_file):
       if addr_type:
-        os.system(f'sshpass -p {password} scp -o StrictHostKeyChecking=no '
-                  f'{username}@{public_address}:{remote_file} {download_path}')
+        scp(password, f'{username}@{public_address}:{remote_file}',
+            download_path, '-o', 'StrictHostKeyChecking=no')
         if remote_file.startswith('/'):
           remote_file = remote_file[1:]
 
         file_name = os.path.join(download_path, os.path.basename(remote_file))
       else:
-        ftp = ftplib.FTP(public_address)
-        ftp.login(username, password)
-        ftp.cwd(os.path.dirname(remote_file))
-
-        filename = os.path.basename(remote_file)
-        file_name = os.path.join(download_path, filename)
-        ftp.retrbinary(f'RETR {filename}', open(file_name, 'wb').write)
-
-        ftp.quit()
+        with ftplib.FTP(public_address) as ftp:
+          ftp.login(username, password)
+          ftp.cwd(os.path.dirname(remote_file))
+
+          filename = os.path.basename(remote_file)
+          file_name = os.path.join(download_path, filename)
+          with open(file_name, 'wb', buffering=CHUNK_SIZE) as file:
+            ftp.retrbinary(f'RETR {filename}', file.write,
+                           blocksize=CHUNK_SIZE)
       status = True
     else:
       return None, 'Remote file is not a media file.'
@@ -285,7 +352,7 @@ def download_using_ftp(username: str,
     return None, '[e] Error while transferring file'
   finally:
     if status:
-      if file_size(file_name).endswith('KB'):
+      if os.stat(file_name).st_size < MIN_FILE_SIZE:
         print(file_name)
         log.error('Unusable file transferred since file size is in KBs.')
         return None, '[w] Unusable file transferred.'
@@ -304,7 +371,8 @@ def concate_batch_from_s3(access_key: str,
                           access_to: str,
                           log: logging.Logger,
                           trim_hrs: Optional[Union[float, int]] = None,
-                          timestamp_format: str = '%Y-%m-%d %H:%M:%S') -> List:
+                          timestamp_format: str = '%Y-%m-%d %H:%M:%S',
+                          prefix_format: str = None) -> List:
   """Downloads multiple files from S3 and concatenate them.
 
   Download multiple files from S3 bucket for particular timeframe and
@@ -318,6 +386,8 @@ def concate_batch_from_s3(access_key: str,
     access_to: Datetime till when to fetch files.
     log: Logger object for logging the status.
     timestamp_format: Timestamp format (default: %Y-%m-%d %H:%M:%S)
+    prefix_format: Date format (default: None) of the key prefix, eg:
+                   '%Y/%m/%d/', to list only the days in the timeframe.
 
   Returns:
     List of the concatenated files.
@@ -326,8 +396,8 @@ def concate_batch_from_s3(access_key: str,
            f'to {access_to} from Amazon S3.')
   list_of_dirs = access_limited_files(access_key, secret_key, bucket_name,
                                       access_from, access_to, log,
-                                      timestamp_format)
-  sorted(list_of_dirs)
+                                      timestamp_format, prefix_format)
+  list_of_dirs = sorted(set(list_of_dirs))
   if len(list_of_dirs) > 0:
     log.info('Concatenating files in their subsequent directories.')
     temp = [concate_videos(idx) for idx in list_of_dirs]
@@ -341,6 +411,23 @@ def concate_batch_from_s3(access_key: str,
     return []
 
 
+def _download_blob(container: ContainerClient,
+                   blob_name: str,
+                   file_name: str,
+                   timestamp: datetime,
+                   log: logging.Logger) -> None:
+  """Download blob and stamp it with the blob creation time.
+
+  The blobs are downloaded concurrently, hence their modification time
+  is set to the creation time to keep the order used while
+  concatenating them.
+  """
+  with open(file_name, 'wb') as file:
+    container.download_blob(blob_name, max_concurrency=4).readinto(file)
+  os.utime(file_name, (timestamp.timestamp(), timestamp.timestamp()))
+  log.info(f'File "{blob_name}" downloaded from Microsoft Azure.')
+
+
 def batch_download_from_azure(account_name: str,
                               account_key: str,
                               container_name: str,
@@ -348,7 +435,8 @@ def batch_download_from_azure(account_name: str,
                               access_to: str,
                               log: logging.Logger,
                               timestamp_format: str = '%Y-%m-%d %H:%M:%S',
-                              download_path: str = videos) -> List:
+                              download_path: str = videos,
+                              name_prefix: str = None) -> List:
   """Download multiple files from Microsoft Azure.
 
   Download multiple files from Azure Blob container for particular
@@ -362,6 +450,8 @@ def batch_download_from_azure(account_name: str,
     file_name: Filename for the downloaded file.
     log: Logger object for logging the status.
     download_path: Path (default: ./videos/) for saving file.
+    name_prefix: Blob name prefix (default: None) to limit the listing
+                 to, if the blob names encode the recording date.
 
   Returns:
     List of the directories which hosts the downloaded files.
@@ -374,48 +464,48 @@ def batch_download_from_azure(account_name: str,
     container = ContainerClient.from_connection_string(connection_string,
                                                   container_name=container_name)
     limit_from = datetime.strptime(
-        access_from, timestamp_format).replace(tzinfo=pytz.UTC)
+        access_from, timestamp_format).replace(tzinfo=timezone.utc)
     limit_till = datetime.strptime(
-        access_to, timestamp_format).replace(tzinfo=pytz.UTC)
+        access_to, timestamp_format).replace(tzinfo=timezone.utc)
     container_dir = os.path.join(videos, container_name)
-    concate_dir = []
-    files_with_timestamp = {}
-    blobs_list = container.list_blobs()
-    unsup_list = container.list_blobs()
-    unsupported = [idx.name
-                   for idx in unsup_list
-                   if not (idx.name).endswith(video_file_extensions)]
-    unsupported = list(set(map(lambda x: os.path.splitext(x)[1], unsupported)))
-    unsupported = [idx for idx in unsupported if idx is not '']
+    concate_dir, selected = set(), []
+    in_range, unsupported = [], set()
+    for blob in container.list_blobs(name_starts_with=name_prefix):
+      extension = os.path.splitext(blob.name)[1]
+      if is_video(blob.name):
+        if limit_from < blob.creation_time < limit_till:
+          in_range.append((blob.name, blob.creation_time, blob.size))
+      elif extension:
+        unsupported.add(extension)
+    unsupported = sorted(unsupported)
     if len(unsupported) > 1:
       log.info(f'Unsupported video formats like "{unsupported[0]}", '
                f'"{unsupported[1]}", etc. will be skipped.')
-    else:
+    elif unsupported:
       log.info(f'Files ending with "{unsupported[0]}" will be skipped.')
-    for blob in blobs_list:
-      if (blob.name).endswith(video_file_extensions):
-        files_with_timestamp[blob.name] = blob.creation_time
-    sorted_files = sorted(files_with_timestamp.items(), key=lambda xa: xa[1])
-    for file, timestamp in sorted_files:
-      if timestamp > limit_from and timestamp < limit_till:
-        blob_style_dir = os.path.join(container_dir, os.path.dirname(file))
-        concate_dir.append(blob_style_dir)
-        if not os.path.isdir(blob_style_dir):
-          os.makedirs(blob_style_dir)
-        download_from_azure(account_name, account_key, container_name,
-                            file, os.path.basename(file[:-4]), log,
-                            blob_style_dir)
-        _glob.append(os.path.join(blob_style_dir, os.path.basename(file)))
+    sizes = []
+    for file, timestamp, size in sorted(in_range, key=lambda xa: xa[1]):
+      blob_style_dir = os.path.join(container_dir, os.path.dirname(file))
+      if blob_style_dir not in concate_dir:
+        os.makedirs(blob_style_dir, exist_ok=True)
+        concate_dir.add(blob_style_dir)
+      _glob.append(os.path.join(blob_style_dir, os.path.basename(file)))
+      selected.append((file, _glob[-1], timestamp))
+      sizes.append(size)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+      list(executor.map(lambda args: _download_blob(container, *args,
+                                                    log=log), selected))
     if len(concate_dir) > 0:
-      sizes = [file_size(s_idx) for s_idx in _glob]
-      temp = [(n, s) for n, s in zip(_glob, sizes)]
-      with open(os.path.join(container_dir, f'{container_name}.csv'), 'a',
-                encoding="utf-8") as csv_file:
+      csv_path = os.path.join(container_dir, f'{container_name}.csv')
+      new_csv = not os.path.exists(csv_path)
+      with open(csv_path, 'a', newline='', encoding="utf-8") as csv_file:
         log.info('Logging downloaded files into a CSV file.')
         _file = csv.writer(csv_file, quoting=csv.QUOTE_MINIMAL)
-        _file.writerow(['Files', 'Size on disk'])
-        _file.writerows(temp)
-      return list(set(concate_dir))
+        if new_csv:
+          _file.writerow(['Files', 'Size on disk'])
+        # Sizes come from the listing, there's no need to stat the files.
+        _file.writerows(zip(_glob, map(convert_bytes, sizes)))
+      return list(concate_dir)
     else:
       return []
   except Exception as e:
@@ -432,8 +522,8 @@ def concate_batch_from_azure(account_name: str,
                              access_to: str,
                              log: logging.Logger,
                              trim_hrs: Optional[Union[float, int]] = None,
-                             timestamp_format: str = '%Y-%m-%d %H:%M:%S'
-                             ) -> List:
+                             timestamp_format: str = '%Y-%m-%d %H:%M:%S',
+                             name_prefix: str = None) -> List:
   """Downloads multiple files from Azure and concatenate them.
 
   Download multiple files from Azure bucket for particular timeframe and
@@ -447,6 +537,8 @@ def concate_batch_from_azure(account_name: str,
     access_to: Datetime till when to fetch files.
     log: Logger object for logging the status.
     timestamp_format: Timestamp format (default: %Y-%m-%d %H:%M:%S)
+    name_prefix: Blob name prefix (default: None) to limit the listing
+                 to.
 
   Returns:
     List of the concatenated files.
@@ -455,8 +547,9 @@ def concate_batch_from_azure(account_name: str,
            f'to {access_to} from Microsoft Azure.')
   list_of_dirs = batch_download_from_azure(account_name, account_key,
                                            container_name, access_from,
-                                           access_to, log, timestamp_format)
-  sorted(list_of_dirs)
+                                           access_to, log, timestamp_format,
+                                           name_prefix=name_prefix)
+  list_of_dirs = sorted(set(list_of_dirs))
   if len(list_of_dirs) > 0:
     log.info('Concatenating files in their subsequent directories.')
     temp = [concate_videos(idx) for idx in list_of_dirs]
@@ -492,14 +585,11 @@ def _is_ftp_dir(ftp: ftplib.FTP, name: str,
 
 def _make_parent_dir(fpath: str, log: logging.Logger) -> None:
   """Ensures the parent directory of a filepath exists."""
-  dirname = os.path.dirname(fpath)
+  dirname = os.path.abspath(os.path.dirname(fpath))
 
-  while not os.path.exists(dirname):
-    try:
-      os.makedirs(dirname)
-      log.info(f'Created directory "{dirname}".')
-    except OSError:
-      _make_parent_dir(dirname, log)
+  if not os.path.isdir(dirname):
+    os.makedirs(dirname, exist_ok=True)
+    log.info(f'Created directory "{dirname}".')
 
 
 def _download_ftp_file(ftp: ftplib.FTP, file_name: str,
@@ -510,8 +600,10 @@ def _download_ftp_file(ftp: ftplib.FTP, file_name: str,
 
   if not os.path.exists(remote_path) or overwrite is True:
     try:
-      if file_name.endswith(video_file_extensions):
-        ftp.retrbinary(f'RETR {file_name}', open(remote_path, 'wb').write)
+      if is_video(file_name):
+        with open(remote_path, 'wb', buffering=CHUNK_SIZE) as file:
+          ftp.retrbinary(f'RETR {file_name}', file.write,
+                         blocksize=CHUNK_SIZE)
         log.info(f'File "{os.path.basename(file_name)}" transferred '
                 'successfully.')
       else:
@@ -530,37 +622,105 @@ def _file_name_match_patern(pattern: str, file_name: str) -> bool:
     return bool(re.match(pattern, file_name))
 
 
+def _list_ftp_dir(ftp: ftplib.FTP, file_name: str,
+                  guess_by_extension: bool) -> List[Tuple[str, bool]]:
+  """Returns items of a remote directory along with their directory
+  status.
+
+  MLSD reports the type of every item in the listing itself, so the
+  items are probed with CWD only if the server doesn't support it.
+  """
+  try:
+    return [(posixpath.join(file_name, name), facts['type'] == 'dir')
+            for name, facts in ftp.mlsd(file_name, facts=['type'])
+            if facts.get('type') in ('dir', 'file')]
+  except ftplib.error_perm:
+    return [(item, _is_ftp_dir(ftp, item, guess_by_extension))
+            for item in ftp.nlst(file_name)]
+
+
 def _mirror_ftp_dir(ftp: ftplib.FTP, file_name: str, overwrite: bool,
                     guess_by_extension: bool, pattern: Union[None, str],
-                    log: logging.Logger) -> None:
-  """Replicates a remote directory on an ftp server recursively."""
+                    log: logging.Logger, files: List[str] = None) -> None:
+  """Replicates a remote directory on an ftp server recursively.
+
+  If `files` is passed, the remote files are collected in it instead
+  of being downloaded over `ftp`.
+  """
   if pattern is None:
         pattern = ''
 
-  for item in ftp.nlst(file_name):
-    if _is_ftp_dir(ftp, item, guess_by_extension):
-      _mirror_ftp_dir(ftp, item, overwrite, guess_by_extension, pattern, log)
+  for item, is_dir in _list_ftp_dir(ftp, file_name, guess_by_extension):
+    if is_dir:
+      _mirror_ftp_dir(ftp, item, overwrite, guess_by_extension, pattern, log,
+                      files)
     else:
       if _file_name_match_patern(pattern, file_name):
-        _download_ftp_file(ftp, item, item, overwrite, log)
+        if files is None:
+          _download_ftp_file(ftp, item, item, overwrite, log)
+        else:
+          files.append(item)
+
+
+def _download_ftp_files(connect: Callable[[], ftplib.FTP], files: List[str],
+                        overwrite: bool, log: logging.Logger,
+                        connections: int) -> None:
+  """Downloads files over a pool of ftp connections.
+
+  FTP runs one transfer at a time per control connection, hence every
+  worker checks out its own connection from the pool.
+  """
+  pool = queue.Queue()
+
+  def _download(item: str) -> None:
+    try:
+      ftp = pool.get_nowait()
+    except queue.Empty:
+      ftp = connect()
+    try:
+      _download_ftp_file(ftp, item, item, overwrite, log)
+    finally:
+      pool.put(ftp)
+
+  try:
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+      list(executor.map(_download, files))
+  finally:
+    while not pool.empty():
+      pool.get_nowait().close()
 
 
 def download_ftp_tree(ftp: ftplib.FTP, file_path: str, remote_path: str,
                       log: logging.Logger, pattern: str = None,
                       overwrite: bool = False,
-                      guess_by_extension: bool = True):
+                      guess_by_extension: bool = True,
+                      connect: Callable[[], ftplib.FTP] = None,
+                      connections: int = 4):
   """Downloads an entire directory tree from an ftp server to the
   videos directory.
+
+  If `connect` is passed, the tree is walked over `ftp` and the files
+  are downloaded in parallel over `connections` logged in connections
+  returned by it.
   """
   file_path = file_path.lstrip("/")
 
   original_directory = os.getcwd()
   os.chdir(remote_path)
 
-  _mirror_ftp_dir(ftp, file_path, log=log, pattern=pattern,
-                  overwrite=overwrite, guess_by_extension=guess_by_extension)
-
-  os.chdir(original_directory)
+  try:
+    if connect is None:
+      _mirror_ftp_dir(ftp, file_path, log=log, pattern=pattern,
+                      overwrite=overwrite,
+                      guess_by_extension=guess_by_extension)
+    else:
+      files = []
+      _mirror_ftp_dir(ftp, file_path, log=log, pattern=pattern,
+                      overwrite=overwrite,
+                      guess_by_extension=guess_by_extension, files=files)
+      _download_ftp_files(connect, files, overwrite, log, connections)
+  finally:
+    os.chdir(original_directory)
 
 
 def batch_download_from_ftp(username: str,
@@ -599,9 +759,8 @@ def batch_download_from_ftp(username: str,
 
     try:
       if addr_type:
-        os.system(f'sshpass -p {password} scp -r '
-                  f'{username}@{public_address}:{remote_path} '
-                  f'{download_path}')
+        scp(password, f'{username}@{public_address}:{remote_path}',
+            download_path, '-r')
         log.info('File(s) transfer from remote directory successful.')
 
         if remote_path.startswith('/'):
@@ -613,11 +772,12 @@ def batch_download_from_ftp(username: str,
         transferred = os.path.join(download_path, os.path.basename(remote_path))
         ftp_files.extend([idx for idx in glob.glob(f'{transferred}/**',
                                                   recursive=True)
-                                                  if idx.endswith
-                                                  (video_file_extensions)])
+                                                  if is_video(idx)])
       else:
-        ftp = ftplib.FTP(public_address, username, password)
-        download_ftp_tree(ftp, remote_path, download_path, log)
+        with ftplib.FTP(public_address, username, password) as ftp:
+          download_ftp_tree(ftp, remote_path, download_path, log,
+                            connect=lambda: ftplib.FTP(public_address,
+                                                       username, password))
 
         if remote_path.startswith('/'):
           remote_path = remote_path[1:]
@@ -630,17 +790,17 @@ def batch_download_from_ftp(username: str,
                                                    recursive=True)
                                                    if os.path.isfile(idx)])
       tup = (["Sr.No.", "Video File Url"],)
-      for _idx, _file in enumerate(ftp_files):
-        list = []
-        s3 = _file.split(download_path)[1]
-        url = upload_to_bucket(_AWS_ACCESS_KEY, _AWS_SECRET_KEY,
-                               'ftp-batch-downloaded-bucket', _file, log, s3)
-        urls.append(url)
-        list.append((_idx)+1)
-        list.append(url)
-        tup += (list,)
+      with ThreadPoolExecutor(max_workers=4) as executor:
+        urls = list(executor.map(
+            lambda _file: upload_to_bucket(AWS_ACCESS_KEY, AWS_SECRET_KEY,
+                                           'ftp-batch-downloaded-bucket',
+                                           _file, log,
+                                           _file.split(download_path)[1]),
+            ftp_files))
+      for _idx, (_file, url) in enumerate(zip(ftp_files, urls)):
+        tup += ([_idx + 1, url],)
         log.info(f'Uploaded {_idx + 1}/{len(ftp_files)} > '
-               f'{os.path.basename(_file)} on to S3 bucket.')
+                 f'{os.path.basename(_file)} on to S3 bucket.')
       html = generateHtml(tup)
       email_to_admin_for_FTP_urls(html)
       return True, urls
@@ -651,20 +811,12 @@ def batch_download_from_ftp(username: str,
 
 
 def generateHtml(data):
-  html = "<table width='100%' cellpadding=4 cellspacing=1 border=1>"
+  rows = []
   for j, Video_urls in data:
-    if j == "Sr.No.":
-      html += "<tr>"
-      html += "<th>"+str(j)+"</th>"
-      html += "<th>"+str(Video_urls)+"</th>"
-      html += "</tr>"
-    else:
-      html += "<tr>"
-      html += "<td>"+str(j)+"</td>"
-      html += "<td>"+str(Video_urls)+"</td>"
-      html += "</tr>"
-  html += "</table>"
-  return html
+    cell = 'th' if j == "Sr.No." else 'td'
+    rows.append(f'<tr><{cell}>{j}</{cell}><{cell}>{Video_urls}</{cell}></tr>')
+  return ("<table width='100%' cellpadding=4 cellspacing=1 border=1>" +
+          ''.join(rows) + "</table>")
 
 
 def earthcam_specific_download(username: str,
@@ -691,6 +843,7 @@ def earthcam_specific_download(username: str,
   Returns:
     Boolean value if the file is downloaded or not.
   """
+  temp = os.path.join(download_path, str(uuid4()))
   try:
     start_date = f"{start_date} 00:00:00"
     prev = (datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S") +
@@ -702,23 +855,26 @@ def earthcam_specific_download(username: str,
     day = f'{day:02d}'
     month = f'{month:02d}'
     hours = range(int(start_hour), int(end_hour))
-    temp = os.path.join(download_path, str(uuid4()))
-
-    if not os.path.exists(temp):
-      os.mkdir(temp)
-
-    for hour in hours:
-      file = os.path.join(static_path, month, day, f'{hour:>02}00.mp4')
-      log.info(f"Fetching file {file}...")
-      _, file = download_using_ftp(username, password, public_address, file,
-                                  log, temp)
+    os.makedirs(temp, exist_ok=True)
+
+    workers = max(1, min(len(hours), 8))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+      futures = []
+      for hour in hours:
+        file = os.path.join(static_path, month, day, f'{hour:>02}00.mp4')
+        log.info(f"Fetching file {file}...")
+        futures.append(executor.submit(download_using_ftp, username, password,
+                                       public_address, file, log, temp))
+      for future in as_completed(futures):
+        future.result()
 
     log.info("Concatenating fetching videos...")
-    output = concate_videos(temp)
+    output = concate_videos(temp, sort_by_name=True)
     main_file = os.path.join(download_path, f'{file_name}.mp4')
-    log.warning("Cleaning directory...")
     shutil.move(output, main_file)
-    os.rmdir(temp)
     return True, main_file
   except Exception:
     return None, 'Remote file is not a media file.'
+  finally:
+    log.warning("Cleaning directory...")
+    shutil.rmtree(temp, ignore_errors=True)
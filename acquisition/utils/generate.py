@@ -4,7 +4,31 @@ import time
 from datetime import datetime
 from typing import Optional, Union
 
-from acquisition.utils.hasher import h_17k, h_26, h_676, h_area, h_country
+from acquisition.utils.hasher import (h_17k_tbl, h_26_tbl, h_676_tbl, h_area,
+                                      h_country, r_26, r_area, r_country)
+
+
+# Video types indexed by the packed (compress, trim, trim_compress) bits.
+_VIDEO_TYPES = ('aa', 'aa', 'an', 'ac', 'ca', 'ca', 'cn', 'cc')
+# Unix second and hashed timestamp of the last `hash_timestamp()` call
+# made for the current time.
+_last_timestamp = (None, '')
+
+
+def _lookup(table: tuple, unique_id: Union[int, float, str]) -> Optional[str]:
+  """Return value at the unique id index or None if out of range."""
+  idx = int(unique_id)
+  return table[idx] if 0 < idx < len(table) else None
+
+
+def _unhash(value: str, width: int) -> int:
+  """Return number for the hashed string by base 26 arithmetic."""
+  if len(value) != width or not all('a' <= char <= 'z' for char in value):
+    raise KeyError(value)
+  number = 0
+  for char in value:
+    number = number * 26 + ord(char) - 97
+  return number + 1
 
 
 def hash_a(unique_id: Union[int, float, str]) -> Optional[str]:
@@ -18,32 +42,32 @@ def hash_a(unique_id: Union[int, float, str]) -> Optional[str]:
     unique_id: Integer, float or string value from database.
 
   Returns:
-    Hashed string from h_26 dictionary.
+    Hashed string from h_26_tbl table.
 
   Notes:
     Values greater than 26 will return None.
   """
-  return h_26.get(int(unique_id), None)
+  return _lookup(h_26_tbl, unique_id)
 
 
 def hash_aa(unique_id: Union[int, float, str]) -> Optional[str]:
   """Return hashed string code for the double unique ids from aa - zz.
 
   The unique id is fetched from the database and should range from 
-  1 to 676 values. The hashing is done purely on the ideology of
-  python dictionaries.
+  1 to 676 values. The hashing is done purely by indexing a
+  precomputed lookup table.
   This function is suitable for hashing values in range of 00-99.
 
   Args:
     unique_id: Integer, float or string value from database.
 
   Returns:
-    Hashed string from h_676 dictionary.
+    Hashed string from h_676_tbl table.
 
   Notes:
     Values greater than 676 will return None.
   """
-  return h_676.get(int(unique_id), None)
+  return _lookup(h_676_tbl, unique_id)
 
 
 def hash_aaa(unique_id: Union[int, float, str],) -> Optional[str]:
@@ -59,12 +83,12 @@ def hash_aaa(unique_id: Union[int, float, str],) -> Optional[str]:
     unique_id: Integer, float or string value from database.
 
   Returns:
-    Hashed string from h_17k dictionary.
+    Hashed string from h_17k_tbl table.
 
   Notes:
     Values greater than 17576 will return None.
   """
-  return h_17k.get(int(unique_id), None)
+  return _lookup(h_17k_tbl, unique_id)
 
 
 def hash_area_code(area: str) -> Optional[str]:
@@ -83,8 +107,7 @@ def hash_area_code(area: str) -> Optional[str]:
     KeyError: If the key is not found.
     ValueError: If the value is not found.
   """
-  # pyright: reportGeneralTypeIssues=false
-  return dict(map(reversed, h_area.items()))[area]
+  return r_area[area]
 
 
 def hash_country_code(country_code: str) -> str:
@@ -102,15 +125,25 @@ def hash_timestamp(now: datetime = None) -> str:
 
   Returns:
     Hashed timestamp in MMDDYYHHmmSS.
+
+  Notes:
+    Calls for the current time reuse the previous result within the
+    same second.
   """
+  global _last_timestamp
   if now is None:
-    now = datetime.now().replace(microsecond=0)
-  return '{}{:0>2}{:0>2}{}{:0>2}{:0>2}'.format(hash_a(now.month),
-                                               str(now.day),
-                                               str(now.year)[2:],
-                                               hash_a(now.hour + 1),
-                                               str(now.minute),
-                                               str(now.second))
+    sec = int(time.time())
+    last_sec, last_hash = _last_timestamp
+    if sec == last_sec:
+      return last_hash
+    last_hash = hash_timestamp(datetime.fromtimestamp(sec))
+    _last_timestamp = (sec, last_hash)
+    return last_hash
+  stamp = now.strftime('%d%y%M%S')
+  # Month (1 - 12) and hour (0 - 23, shifted by one) index the table
+  # directly.
+  return ''.join([h_26_tbl[now.month], stamp[:4],
+                  h_26_tbl[now.hour + 1], stamp[4:]])
 
 
 def bucket_name(country_code: str,
@@ -133,10 +166,8 @@ def bucket_name(country_code: str,
   Raises:
     TypeError: If any positional arguments are skipped.
   """
-  return '{}{:0>4}{:0>2}{:0>2}'.format(hash_country_code(country_code),
-                                       int(customer_id),
-                                       int(contract_id),
-                                       int(order_id))
+  return (f'{hash_country_code(country_code)}{int(customer_id):0>4}'
+          f'{int(contract_id):0>2}{int(order_id):0>2}')
 
 
 def order_name(store_id: Union[int, float, str],
@@ -159,8 +190,8 @@ def order_name(store_id: Union[int, float, str],
   Raises:
     TypeError: If any positional arguments are skipped.
   """
-  return '{:0>5}{}{:0>2}{}'.format(int(store_id), area_code,
-                                   int(camera_id), hash_timestamp(timestamp))
+  return (f'{int(store_id):0>5}{area_code}{int(camera_id):0>2}'
+          f'{hash_timestamp(timestamp)}')
 
 
 def video_type(compress: bool = False,
@@ -168,7 +199,7 @@ def video_type(compress: bool = False,
                trim_compress: bool = False) -> str:
   """Return type of the video.
 
-  The returned value is generated by conditional checks.
+  The returned value is looked up from the packed boolean flags.
 
   Args:
     compress: Boolean value (default: False) if video to be compress.
@@ -179,14 +210,9 @@ def video_type(compress: bool = False,
   Returns:
     String for video type.
   """
-  temp = ['a', 'a']
-  if compress:
-      temp[0] = 'c'
-  if trim:
-      temp[1] = 'n'
-      if trim_compress:
-          temp[1] = 'c'
-  return ''.join(temp)
+  return _VIDEO_TYPES[(bool(compress) << 2) |
+                      (bool(trim) << 1) |
+                      bool(trim_compress)]
 
 
 def unhash_a(value: str) -> Optional[str]:
@@ -205,7 +231,7 @@ def unhash_a(value: str) -> Optional[str]:
     KeyError: If an invalid value is passed for unhashing.
     ValueError: If the value to be unhashed is greater than the range.
   """
-  return str(dict(map(reversed, h_26.items()))[value])
+  return str(r_26[value])
 
 
 def unhash_aa(value: str) -> Optional[str]:
@@ -224,7 +250,7 @@ def unhash_aa(value: str) -> Optional[str]:
     KeyError: If an invalid value is passed for unhashing.
     ValueError: If the value to be unhashed is greater than the range.
   """
-  return str(dict(map(reversed, h_676.items()))[value])
+  return str(_unhash(value, 2))
 
 
 def unhash_aaa(value: str) -> Optional[str]:
@@ -243,7 +269,7 @@ def unhash_aaa(value: str) -> Optional[str]:
     KeyError: If an invalid value is passed for unhashing.
     ValueError: If the value to be unhashed is greater than the range.
   """
-  return str(dict(map(reversed, h_17k.items()))[value])
+  return str(_unhash(value, 3))
 
 
 def unhash_area_code(area_code: str) -> Optional[str]:
@@ -253,7 +279,7 @@ def unhash_area_code(area_code: str) -> Optional[str]:
 
 def unhash_country_code(hashed_code: str) -> Optional[str]:
   """Return unhashed country code."""
-  return dict(map(reversed, h_country.items()))[hashed_code]
+  return r_country[hashed_code]
 
 
 def unhash_timestamp(hashed_timestamp: str,
@@ -270,11 +296,27 @@ def unhash_timestamp(hashed_timestamp: str,
 
   Returns:
     Datetime object or a Unix time (float) value of the hashed time.
+
+  Notes:
+    The default format is parsed by slicing the fixed positions of the
+    hashed timestamp generated by `hash_timestamp()`.
   """
-  temp = hashed_timestamp.replace(hashed_timestamp[0],
-                                  unhash_a(hashed_timestamp[0]))
-  temp = temp.replace(temp[5], str(int(unhash_a(hashed_timestamp[5])) - 1))
-  if unix_time:
-    return time.mktime(datetime.strptime(temp, timestamp_format).timetuple())
+  if timestamp_format == '%m%d%y%H%M%S':
+    year = int(hashed_timestamp[3:5])
+    # Same century rule as `%y` in `datetime.strptime()`.
+    year += 2000 if year < 69 else 1900
+    value = datetime(year,
+                     r_26[hashed_timestamp[0]],
+                     int(hashed_timestamp[1:3]),
+                     r_26[hashed_timestamp[5]] - 1,
+                     int(hashed_timestamp[6:8]),
+                     int(hashed_timestamp[8:10]))
   else:
-    return datetime.strptime(temp, timestamp_format)
+    temp = hashed_timestamp.replace(hashed_timestamp[0],
+                                    unhash_a(hashed_timestamp[0]))
+    temp = temp.replace(temp[5],
+                        str(int(unhash_a(hashed_timestamp[5])) - 1))
+    value = datetime.strptime(temp, timestamp_format)
+  if unix_time:
+    return time.mktime(value.timetuple())
+  return value
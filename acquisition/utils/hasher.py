@@ -5,14 +5,19 @@ import string
 
 # Dictionary for characters from range 1 - 26.
 h_26 = {k: v for k, v in enumerate(string.ascii_lowercase, start=1)}
-# Dictionary for characters from range 1 - 676.
-t_676 = itertools.product(string.ascii_lowercase, string.ascii_lowercase)
-h_676 = {k: v for k, v in enumerate(list(map(''.join, t_676)), start=1)}
-# Dictionary for characters from range 1 - 17576.
-t_17k = itertools.product(string.ascii_lowercase,
-                          string.ascii_lowercase,
-                          string.ascii_lowercase)
-h_17k = {k: v for k, v in enumerate(list(map(''.join, t_17k)), start=1)}
+# Lookup tables for the hashes. The ids are dense 1..N ranges, so
+# indexing a tuple avoids hashing on every lookup. Index 0 is a
+# placeholder to keep the ids 1-based.
+# Table for characters from range 1 - 26.
+h_26_tbl = (None,) + tuple(string.ascii_lowercase)
+# Table for characters from range 1 - 676.
+h_676_tbl = (None,) + tuple(map(''.join,
+                                itertools.product(string.ascii_lowercase,
+                                                  repeat=2)))
+# Table for characters from range 1 - 17576.
+h_17k_tbl = (None,) + tuple(map(''.join,
+                                itertools.product(string.ascii_lowercase,
+                                                  repeat=3)))
 # Dictionary for hashing area.
 h_area = {'p': 'Parking lot',
           'g': 'Garage',
@@ -66,5 +71,10 @@ country_codes_2_letter = ['af', 'al', 'dz', 'as', 'ad', 'ao', 'ai', 'aq', 'ag',
                           'us', 'um', 'uy', 'uz', 'vu', 've', 'vn', 'vg', 'vi',
                           'wf', 'eh', 'ye', 'zm', 'zw']
 # Dictionary of hashed country codes.
-h_248 = list(h_676.values())[:248]
+h_248 = h_676_tbl[1:249]
 h_country = {k: v for k, v in zip(country_codes_2_letter, h_248)}
+
+# Reversed dictionaries for unhashing the above hashes.
+r_26 = {v: k for k, v in h_26.items()}
+r_area = {v: k for k, v in h_area.items()}
+r_country = {v: k for k, v in h_country.items()}
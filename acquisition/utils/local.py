@@ -2,12 +2,18 @@
 
 import os
 import shutil
-from pathlib import Path
 from typing import Tuple
 
 from acquisition.utils.generate import hash_aa
 
 
+def _split(file: str) -> Tuple[str, str, str]:
+  """Return directory, stem and extension of the file."""
+  head, tail = os.path.split(file)
+  stem, ext = os.path.splitext(tail)
+  return head, stem, ext
+
+
 def create_dir_with_same_filename(file: str) -> str:
   """Create directory with same filename and return it's path.
 
@@ -17,7 +23,8 @@ def create_dir_with_same_filename(file: str) -> str:
   Returns:
     Directory path.
   """
-  directory_path = os.path.join(os.path.dirname(file), Path(file).stem)
+  head, stem, _ = _split(file)
+  directory_path = os.path.join(head, stem)
   if not os.path.isdir(directory_path):
     os.mkdir(directory_path)
   return directory_path
@@ -41,21 +48,23 @@ def create_copy(file: str,
 
   if copy_name is None:
     copy_name = os.path.basename(file)
-  return shutil.copy(file, os.path.join(copy_path, copy_name))
+  copy_file = shutil.copyfile(file, os.path.join(copy_path, copy_name))
+  shutil.copymode(file, copy_file)
+  return copy_file
 
 
 def rename_original_file(file: str, bucket_name: str, order_name: str) -> str:
   """Renames original file."""
-  new_name = file.replace(Path(file).stem, f'{bucket_name}{order_name}aaaa')
-  os.rename(file, file.replace(Path(file).stem,
-                               f'{bucket_name}{order_name}aaaa'))
+  head, _, ext = _split(file)
+  new_name = os.path.join(head, f'{bucket_name}{order_name}aaaa{ext}')
+  os.rename(file, new_name)
   return new_name
 
 
 def rename_aaaa_file(file: str, video_type: str) -> str:
   """Replaces 'aaaa' in the filename with video type sequence."""
-  temp_name = ''.join([Path(file).stem[:-4], video_type])
-  new_name = file.replace(Path(file).stem, temp_name)
+  head, stem, ext = _split(file)
+  new_name = os.path.join(head, ''.join([stem[:-4], video_type, ext]))
   os.rename(file, new_name)
   return new_name
 
@@ -68,8 +77,8 @@ def temporary_rename(file: str, rename: str = 'temp_xa') -> str:
 
 def temporary_copy(file: str, rename: str = 'temp_xa') -> str:
   """Creates a temporary copy for operation."""
-  temp_file = temporary_rename(file, rename)
-  return shutil.copy(file, temp_file)
+  # Only the data is needed, the permission bits aren't copied.
+  return shutil.copyfile(file, temporary_rename(file, rename))
 
 
 def filename(file: str, video_num: int) -> str:
@@ -11,17 +11,24 @@ from acquisition.utils.paths import logs
 
 class TimeFormatter(logging.Formatter):
 
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    # Formatted pieces around the milliseconds for the last second seen,
+    # kept as a single tuple so concurrent handlers never see it torn.
+    self._cache = (None, None, ())
+
   def formatTime(self, record, datefmt=None):
-    convert = self.converter(record.created)
-    if datefmt:
-      if '%F' in datefmt:
-        msec = '%03d' % record.msecs
-        datefmt = datefmt.replace('%F', msec)
-      string = time.strftime(datefmt, convert)
-    else:
-      temp = time.strftime('%Y-%m-%d %H:%M:%S', convert)
-      string = '%s.%03d' % (temp, record.msecs)
-    return string
+    sec = int(record.created)
+    cached_sec, cached_fmt, parts = self._cache
+    if sec != cached_sec or datefmt != cached_fmt:
+      convert = self.converter(record.created)
+      if datefmt:
+        parts = tuple(time.strftime(part, convert)
+                      for part in datefmt.split('%F'))
+      else:
+        parts = (time.strftime('%Y-%m-%d %H:%M:%S.', convert), '')
+      self._cache = (sec, datefmt, parts)
+    return ('%03d' % record.msecs).join(parts)
 
 
 def log(level: str = 'debug') -> logging.Logger:
@@ -36,9 +43,13 @@ def log(level: str = 'debug') -> logging.Logger:
   """
   logger = logging.getLogger()
   logger.setLevel(f'{level.upper()}')
+  # Handlers are attached only once, repeated calls would otherwise
+  # write every record multiple times.
+  if any(isinstance(handler.formatter, TimeFormatter)
+         for handler in logger.handlers):
+    return logger
   name = Path(os.path.abspath(sys.modules["__main__"].__file__)).stem
   name = f'{name}.log'
-  name = Path(os.path.join(logs, name))
   custom_format = ('%(asctime)s %(levelname)-8s %(threadName)-8s  '
                    '%(filename)18s:%(lineno)04d  %(message)s')
   formatter = TimeFormatter(custom_format, '%Y-%m-%d %H:%M:%S.%F %Z')
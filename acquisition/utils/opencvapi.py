@@ -1,28 +1,45 @@
 """Utility for making convenient use of OpenCV."""
 
 import logging
+import select
 import socket
+import time
+from functools import lru_cache
 from typing import Any, Optional, Union
 
 import cv2
 import numpy as np
 
 
+@lru_cache(maxsize=None)
+def cuda_available() -> bool:
+  """Return True if OpenCV is built with CUDA and a device is present."""
+  try:
+    return cv2.cuda.getCudaEnabledDeviceCount() > 0
+  except (AttributeError, cv2.error):
+    return False
+
+
 def rescale(frame: np.ndarray,
             width: Optional[int] = 300,
             height: Optional[int] = None,
-            interpolation: Optional[Any] = cv2.INTER_AREA) -> np.ndarray:
+            interpolation: Optional[Any] = cv2.INTER_LINEAR,
+            gpu: bool = False) -> np.ndarray:
   """Rescale the frame.
 
   Rescale the stream to a desirable size. This is required before
-  performing the necessary operations.
+  performing the necessary operations. Large downscales with linear
+  interpolation are first halved using an image pyramid, which is
+  much cheaper than area interpolation and looks the same.
 
   Args:
     frame: Numpy array of the image frame.
     width: Width (default: None) to be rescaled to.
     height: Height (default: None) to be rescaled to.
-    interpolation: Interpolation algorithm (default: INTER_AREA) to be
+    interpolation: Interpolation algorithm (default: INTER_LINEAR) to be
                     used.
+    gpu: Boolean (default: False) value if the frame should be resized
+         on a CUDA device. Falls back to the CPU if none is available.
 
   Returns:
     Rescaled numpy array for the input frame.
@@ -43,6 +60,18 @@ def rescale(frame: np.ndarray,
     ratio = width / float(frame_width)
     dimensions = (width, int(frame_height * ratio))
 
+  if gpu and cuda_available():
+    gpu_frame = cv2.cuda_GpuMat()
+    gpu_frame.upload(frame)
+    return cv2.cuda.resize(gpu_frame, dimensions,
+                           interpolation=interpolation).download()
+
+  if interpolation == cv2.INTER_LINEAR:
+    while (0 < dimensions[0] * 2 <= frame_width and
+           0 < dimensions[1] * 2 <= frame_height):
+      frame = cv2.pyrDown(frame)
+      frame_height, frame_width = frame.shape[:2]
+
   return cv2.resize(frame, dimensions, interpolation=interpolation)
 
 
@@ -67,16 +96,44 @@ def camera_live(camera_address: str,
                 camera_port: Union[int, str],
                 log: logging.Logger,
                 timeout: Union[float, int, str] = 10.0) -> bool:
-  """Check if any camera connectivity is available."""
+  """Check if any camera connectivity is available.
+
+  All the addresses the camera resolves to are tried at once using
+  non-blocking sockets. The check returns as soon as one of them
+  connects, or once all of them are refused, instead of trying each
+  address in turn with the full timeout.
+  """
   # You can find the reference code here:
   # https://gist.github.com/yasinkuyu/aa505c1f4bbb4016281d7167b8fa2fc2
+  sockets = []
   try:
-    timeout = float(timeout)
-    camera_port = int(camera_port)
-    socket.create_connection((camera_address, camera_port), timeout = timeout)
-    log.info('Camera connected to the network.')
-    return True
+    deadline = time.monotonic() + float(timeout)
+    for family, kind, proto, _, address in socket.getaddrinfo(
+            camera_address, int(camera_port), type=socket.SOCK_STREAM):
+      try:
+        sock = socket.socket(family, kind, proto)
+      except OSError:
+        continue
+      sockets.append(sock)
+      sock.setblocking(False)
+      sock.connect_ex(address)
+    pending = list(sockets)
+    while pending:
+      remaining = deadline - time.monotonic()
+      if remaining <= 0:
+        break
+      # Failed connects are reported as writable on POSIX and as
+      # exceptional on Windows.
+      _, writable, failed = select.select([], pending, pending, remaining)
+      for sock in set(writable) | set(failed):
+        if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+          log.info('Camera connected to the network.')
+          return True
+        pending.remove(sock)
   except OSError:
     pass
+  finally:
+    for sock in sockets:
+      sock.close()
   log.warning('Camera not connected to any network.')
   return False
@@ -1,13 +1,22 @@
 """Utility for defining the necessary paths."""
 
 import os
+from pathlib import Path
 
 # Parent directory path. All the references will be made relatively
 # using the below defined parent directory.
-parent_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+parent_path = str(Path(__file__).resolve().parents[2])
 
 # Path where all the downloaded files are stored.
 videos = os.path.join(parent_path, 'videos')
 
 # Other paths
 logs = os.path.join(parent_path, 'logs')
+
+# Create the directories once so that the callers can write to them
+# directly. A read-only install is left for the callers to report.
+for _path in (videos, logs):
+  try:
+    os.makedirs(_path, exist_ok=True)
+  except OSError:
+    pass
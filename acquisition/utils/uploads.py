@@ -4,6 +4,8 @@ import logging
 import os
 from typing import Optional
 
+from acquisition.utils.common import scp
+
 
 def push_to_client_ftp(username: str,
                        password: str,
@@ -13,7 +15,9 @@ def push_to_client_ftp(username: str,
                        log: logging.Logger) -> Optional[bool]:
   """Upload/push file using OpenSSH via FTP.
 
-  Push file from current machine to a remote machine.
+  Push file from current machine to a remote machine. The SSH
+  connection is shared across calls to the same host, so pushing a
+  batch of files pays for a single handshake.
 
   Args:
     username: Username of the remote machine.
@@ -28,11 +32,13 @@ def push_to_client_ftp(username: str,
   # You can find the reference code here:
   # https://stackoverflow.com/a/56850195
   try:
-    os.system(f'sshpass -p {password} scp -o StrictHostKeyChecking=no '
-              f'{file_path} {username}@{public_address}:{remote_path}')
-    log.info(f'File "{os.path.basename(file_path)}" transferred successfully.')
-    return True
+    if scp(password, file_path, f'{username}@{public_address}:{remote_path}',
+           '-o', 'StrictHostKeyChecking=no') == 0:
+      log.info(f'File "{os.path.basename(file_path)}" transferred '
+               'successfully.')
+      return True
   except OSError:
-    log.error('File transfer via FTP failed because of poor network '
-              'connectivity.')
-    return None
+    pass
+  log.error('File transfer via FTP failed because of poor network '
+            'connectivity.')
+  return None
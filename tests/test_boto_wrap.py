@@ -0,0 +1,70 @@
+"""Tests for the Boto3 wrapper."""
+
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from boto3.exceptions import S3UploadFailedError
+from botocore.exceptions import ClientError
+from botocore.utils import calculate_tree_hash
+
+from acquisition.utils import boto_wrap
+
+
+def _upload_failed(code: str) -> S3UploadFailedError:
+  """Return upload error raised the way boto3's managed upload does."""
+  try:
+    try:
+      raise ClientError({'Error': {'Code': code}}, 'PutObject')
+    except ClientError as error:
+      raise S3UploadFailedError(f'Failed to upload: {error}')
+  except S3UploadFailedError as error:
+    return error
+
+
+class WithRetryTest(unittest.TestCase):
+
+  def setUp(self):
+    patcher = mock.patch.object(boto_wrap.time, 'sleep')
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_retries_throttled_upload(self):
+    upload = mock.Mock(side_effect=[_upload_failed('SlowDown'), 'uploaded'])
+    self.assertEqual(boto_wrap.with_retry(upload, 'file', 'bucket', 'key'),
+                     'uploaded')
+    self.assertEqual(upload.call_count, 2)
+
+  def test_raises_permanent_upload_failure(self):
+    upload = mock.Mock(side_effect=_upload_failed('AccessDenied'))
+    with self.assertRaises(S3UploadFailedError):
+      boto_wrap.with_retry(upload, 'file', 'bucket', 'key')
+    self.assertEqual(upload.call_count, 1)
+
+
+class TreeHashTest(unittest.TestCase):
+
+  def test_matches_botocore(self):
+    for size in (0, 1, boto_wrap._MB, 3 * boto_wrap._MB + 512):
+      data = os.urandom(size)
+      leaves = boto_wrap._leaf_hashes(memoryview(data))
+      self.assertEqual(boto_wrap._tree_hash(leaves),
+                       calculate_tree_hash(io.BytesIO(data)), size)
+
+  def test_uploads_empty_archive(self):
+    with tempfile.NamedTemporaryFile() as archive:
+      glacier = mock.Mock()
+      glacier.initiate_multipart_upload.return_value = {'uploadId': 'id'}
+      with mock.patch.object(boto_wrap, 'aws_client', return_value=glacier):
+        boto_wrap.upload_to_vault('key', 'secret', 'vault', archive.name,
+                                  mock.Mock())
+    glacier.upload_multipart_part.assert_not_called()
+    glacier.complete_multipart_upload.assert_called_once_with(
+        vaultName='vault', uploadId='id', archiveSize='0',
+        checksum=calculate_tree_hash(io.BytesIO(b'')))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,58 @@
+"""Tests for the processing server circuit breaker."""
+
+import sys
+import unittest
+from unittest import mock
+
+# The Django `app` package is provided by the host project.
+sys.modules.setdefault('app', mock.MagicMock())
+
+from acquisition.core import bugsbunny  # noqa: E402
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+  def setUp(self):
+    patcher = mock.patch.dict(bugsbunny._breaker, state='closed',
+                              failures=0, opened_at=0.0)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_opens_after_threshold_consecutive_failures(self):
+    for _ in range(bugsbunny._BREAKER_THRESHOLD - 1):
+      bugsbunny._breaker_record(False)
+    self.assertTrue(bugsbunny._breaker_allows())
+    bugsbunny._breaker_record(False)
+    self.assertEqual(bugsbunny._breaker['state'], 'open')
+    self.assertFalse(bugsbunny._breaker_allows())
+
+  def test_success_resets_failures(self):
+    for _ in range(bugsbunny._BREAKER_THRESHOLD - 1):
+      bugsbunny._breaker_record(False)
+    bugsbunny._breaker_record(True)
+    bugsbunny._breaker_record(False)
+    self.assertEqual(bugsbunny._breaker['state'], 'closed')
+
+  def test_trigger_gets_through_after_cooldown(self):
+    clock = [1000.0]
+
+    def sleep(secs):
+      clock[0] += secs
+
+    for _ in range(bugsbunny._BREAKER_THRESHOLD):
+      with mock.patch.object(bugsbunny.time, 'time', lambda: clock[0]):
+        bugsbunny._breaker_record(False)
+    self.assertEqual(bugsbunny._breaker['state'], 'open')
+
+    log = mock.Mock()
+    with mock.patch.object(bugsbunny.time, 'time', lambda: clock[0]), \
+         mock.patch.object(bugsbunny.time, 'sleep', sleep), \
+         mock.patch.object(bugsbunny._SESSION, 'post') as post:
+      self.assertTrue(bugsbunny._trigger({}, log, 30.0))
+    post.assert_called_once()
+    self.assertGreaterEqual(clock[0], 1000.0 + bugsbunny._BREAKER_COOLDOWN)
+    self.assertEqual(bugsbunny._breaker['state'], 'closed')
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,58 @@
+"""Tests for trimming the videos."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from acquisition.core import trim
+
+
+class TimestampTest(unittest.TestCase):
+
+  def test_rounds_up_into_next_minute(self):
+    self.assertEqual(trim._timestamp(59.9996), '00:01:00.000')
+    self.assertEqual(trim._timestamp(119.9999), '00:02:00.000')
+    self.assertEqual(trim._timestamp(3599.9999), '01:00:00.000')
+
+  def test_formats_millisecs(self):
+    self.assertEqual(trim._timestamp('0'), '00:00:00.000')
+    self.assertEqual(trim._timestamp(61.25), '00:01:01.250')
+
+
+class TrimByFactorTest(unittest.TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.addCleanup(self.directory.cleanup)
+    # The `%` checks the segment pattern escapes the file path.
+    self.file = os.path.join(self.directory.name, 'cam%1.mp4')
+    open(self.file, 'wb').close()
+
+  def _segment(self, written):
+    """Return fake ffmpeg run writing the given number of segments."""
+    def run(command, **kwargs):
+      root, extension = os.path.splitext(self.file)
+      for idx in range(written):
+        open(f'{root}_segment_{idx:03d}{extension}', 'wb').close()
+    return run
+
+  def test_fewer_keyframes_than_split_points(self):
+    with mock.patch.object(trim, 'duration', return_value=95.0), \
+         mock.patch.object(trim.subprocess, 'run', self._segment(2)):
+      clips = trim.trim_by_factor(self.file, clip_length=30)
+    root, extension = os.path.splitext(self.file)
+    self.assertEqual(clips, [f'{root}aa{extension}', f'{root}ab{extension}'])
+    self.assertEqual(sorted(os.listdir(self.directory.name)),
+                     sorted(map(os.path.basename, [self.file, *clips])))
+
+  def test_extra_segments_are_removed(self):
+    with mock.patch.object(trim, 'duration', return_value=95.0), \
+         mock.patch.object(trim.subprocess, 'run', self._segment(4)):
+      clips = trim.trim_by_factor(self.file, clip_length=30)
+    self.assertEqual(len(clips), 3)
+    self.assertEqual(len(os.listdir(self.directory.name)), 4)
+
+
+if __name__ == '__main__':
+  unittest.main()